@@ -0,0 +1,156 @@
+# -*- coding: UTF-8 -*-
+
+"""Solving a large number of Sudoku puzzles at once, using NumPy.
+
+The puzzles are kept together in one array, and the 2 algorithms of
+logic.Solver.Step1 (naked singles and hidden singles, in rows, cols and
+boxes) are run on all of them at once as array operations. Only the puzzles
+left incomplete by these get solved one by one, by the module dlx.
+
+Like dlx, nothing is explained here - only the solutions are returned.
+
+NumPy is needed only by this module, the rest of the app works without it.
+"""
+
+__author__ = u"पुष्पक दगड़े (Pushpak Dagade)"
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import dlx
+from logic import Labels, AllLabelsMask, BitCount, LowestLabelIndex, \
+    Units, CellUnits
+
+# Status of a puzzle after PropagateSingles
+Solved = 0
+Stuck = 1
+Incorrect = 2
+
+# Every label as written by logic.Solver.WritePuzzleToString
+WrittenLabels = ['. '] + [label + ' ' for label in Labels[1:]]
+LabelIndexes = dict((Labels[i], i) for i in xrange(1, 10))
+
+if numpy is not None:
+    # The lookup tables of logic as arrays (to be indexed by arrays).
+    BitCountArray = numpy.array(BitCount, dtype=numpy.uint8)
+    LowestLabelIndexArray = numpy.array(LowestLabelIndex, dtype=numpy.int8)
+    LabelBitsArray = numpy.array([0] + [1 << i for i in xrange(9)],
+                                 dtype=numpy.uint16)
+    UnitsArray = numpy.array(Units)
+    CellRows, CellCols, CellBoxes = numpy.array(CellUnits).T
+
+
+def ReadPuzzles(str_input_puzzles):
+    """Return an (N, 81) array of the indexes (in Labels) of the labels of
+    the puzzles in the list of strings str_input_puzzles (in the format of
+    logic.Solver.ReadPuzzleFromString). Empty cells, labels not in Labels
+    and the cells missing from a string of less than 81 labels get index
+    0."""
+    grid = numpy.zeros((len(str_input_puzzles), 81), dtype=numpy.int8)
+    for i, str_puzzle in enumerate(str_input_puzzles):
+        indexes = [LabelIndexes.get(ch, 0) for ch in str_puzzle.split()[:81]]
+        grid[i, :len(indexes)] = indexes
+    return grid
+
+
+def WritePuzzle(indexes):
+    """Return the puzzle with the labels of the list 'indexes' as a string,
+    in the format of logic.Solver.WritePuzzleToString."""
+    return ''.join([WrittenLabels[index] for index in indexes])
+
+
+def PropagateSingles(grid):
+    """Fill the puzzles in 'grid' (an (N, 81) array, see ReadPuzzles) with
+    naked and hidden singles, in place, and return an (N,) array of their
+    status (Solved, Stuck or Incorrect).
+
+    Every pass fills all the singles found, in all the puzzles, at once.
+    The permissible labels are worked out again from the filled cells on
+    every pass, so that there is nothing else to keep up to date (filling
+    singles never removes a label otherwise). A puzzle is incorrect if a
+    label is placed twice in a unit, if an empty cell has no permissible
+    label or if a label has no place left in a unit (this also catches two
+    singles of the same pass contradicting each other, on the next pass).
+    Puzzles are left out of the passes as soon as their status is known.
+    """
+    status = numpy.empty(len(grid), dtype=numpy.int8)
+    active = numpy.arange(len(grid))
+    while len(active):
+        puzzles = grid[active]
+        empty = puzzles == 0
+
+        unitbits = LabelBitsArray[puzzles][:, UnitsArray]
+        placed = numpy.bitwise_or.reduce(unitbits, axis=2)
+        # (the bits of distinct labels add up to their OR)
+        incorrect = (unitbits.sum(axis=2) != placed).any(axis=1)
+
+        candidates = ~(placed[:, CellRows] | placed[:, CellCols] |
+                       placed[:, CellBoxes]) & AllLabelsMask
+        candidates[~empty] = 0
+        count = BitCountArray[candidates]
+        incorrect |= (empty & (count == 0)).any(axis=1)
+
+        # 1st algorithm (naked singles) -
+        filled = puzzles.copy()
+        singles = empty & (count == 1)
+        filled[singles] = LowestLabelIndexArray[candidates[singles]]
+
+        # 2nd algorithm (hidden singles) -
+        unitcandidates = candidates[:, UnitsArray]
+        for index in xrange(1, 10):
+            bit = 1 << (index - 1)
+            possible = (unitcandidates & bit) != 0
+            places = possible.sum(axis=2)
+            homeless = (placed & bit) == 0
+            incorrect |= (homeless & (places == 0)).any(axis=1)
+            puzzle, unit = numpy.nonzero(homeless & (places == 1))
+            if len(puzzle):
+                cells = UnitsArray[unit,
+                                   possible[puzzle, unit].argmax(axis=1)]
+                # (a cell may be a single for more than one label, the
+                # contradiction shows up on the next pass)
+                vacant = filled[puzzle, cells] == 0
+                filled[puzzle[vacant], cells[vacant]] = index
+
+        complete = ~empty.any(axis=1) & ~incorrect
+        changed = (filled != puzzles).any(axis=1) & ~incorrect & ~complete
+        grid[active] = filled
+        status[active[incorrect]] = Incorrect
+        status[active[complete]] = Solved
+        status[active[~(incorrect | complete | changed)]] = Stuck
+        active = active[changed]
+    return status
+
+
+def SolveSudokuPuzzles(str_input_puzzles, BatchSize=10000):
+    """
+    Solve the puzzles in the list of strings str_input_puzzles and return
+    the list of their solution puzzles (as strings), in the same format as
+    logic.SolveSudokuPuzzle.
+
+    The puzzles are solved BatchSize at a time (to keep the arrays to a
+    reasonable size). A puzzle having no solution is returned as it is
+    (except for labels not in Labels, which are returned as empty cells).
+    """
+    if numpy is None:
+        raise ImportError("batchsolver needs NumPy, which is not installed")
+
+    solutions = []
+    for start in xrange(0, len(str_input_puzzles), BatchSize):
+        grid = ReadPuzzles(str_input_puzzles[start:start + BatchSize])
+        givens = grid.copy()
+        status = PropagateSingles(grid)
+        for puzzle, given, puzzle_status in zip(grid.tolist(),
+                                                givens.tolist(), status):
+            if puzzle_status == Solved:
+                solutions.append(WritePuzzle(puzzle))
+                continue
+            solution = None
+            if puzzle_status == Stuck:
+                solution = dlx.SolveSudokuPuzzle(WritePuzzle(puzzle))
+            if solution is None or '.' in solution:
+                solution = WritePuzzle(given)
+            solutions.append(solution)
+    return solutions
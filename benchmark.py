@@ -0,0 +1,87 @@
+#!/usr/bin/python -u
+# -*- coding: utf-8 -*-
+
+"""
+Compare the time taken by the engines of logic.SolveSudokuPuzzle to solve
+the same puzzles.
+
+Usage: python benchmark.py [puzzles file] [repeats]
+
+The puzzles file has one puzzle per line, as 81 characters (row after row,
+'.' or '0' for empty cells). Without it, a few built-in puzzles are used.
+The solution printed by the 'logic' engine is thrown away, but its time is
+still counted (it is a part of the work done by that engine).
+"""
+
+__author__ = u"पुष्पक दगड़े (Pushpak Dagade)"
+
+import os
+import sys
+import time
+
+import logic
+
+Engines = ('logic', 'dlx')
+
+# The 1st one is the puzzle of "Sample Solution".
+Puzzles = (
+    "..53.....8......2..7..1.5..4....53...1..7...6..32...8..6.5....9..4....3."
+    ".....97..",
+    "53..7....6..195....98....6.8...6...34..8.3..17...2...6.6....28....419..5"
+    "....8..79",
+    "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2....."
+    "1.4......",
+    "52...6.........7.13...........4..8..6......5...........418.........3..2."
+    "..87.....",
+    "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1."
+    ".9....4..",
+)
+
+
+def ReadPuzzles(filename):
+    """Return the puzzles in the file 'filename'."""
+    puzzles = []
+    for line in open(filename):
+        line = line.strip()
+        if len(line) == 81:
+            puzzles.append(line.replace('0', '.'))
+    return puzzles
+
+
+def TimeEngine(engine, puzzles, repeats):
+    """Return the least time (in seconds) taken by 'engine' to solve all
+    the puzzles, out of 'repeats' runs, along with the number of puzzles
+    it solved."""
+    best = None
+    stdout = sys.stdout
+    devnull = open(os.devnull, 'w')
+    try:
+        for _ in xrange(repeats):
+            sys.stdout = devnull
+            start = time.time()
+            solutions = [logic.SolveSudokuPuzzle(' '.join(puzzle),
+                                                 engine=engine)
+                         for puzzle in puzzles]
+            elapsed = time.time() - start
+            sys.stdout = stdout
+            if best is None or elapsed < best:
+                best = elapsed
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+    solved = len([solution for solution in solutions if '.' not in solution])
+    return best, solved
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        puzzles = ReadPuzzles(sys.argv[1])
+    else:
+        puzzles = Puzzles
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print "%d puzzles, best of %d runs" % (len(puzzles), repeats)
+    for engine in Engines:
+        elapsed, solved = TimeEngine(engine, puzzles, repeats)
+        print "%-6s %8.4f s  (%.2f ms per puzzle, %d solved)" \
+              % (engine, elapsed, elapsed * 1000 / len(puzzles), solved)
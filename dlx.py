@@ -0,0 +1,232 @@
+# -*- coding: UTF-8 -*-
+
+"""Solving a Sudoku puzzle as an exact cover problem, using Knuth's
+Algorithm X on dancing links (DLX).
+
+Unlike the module logic, nothing is explained here - the puzzle is just
+solved, as fast as possible. Use this when only the solution is needed
+(see logic.SolveSudokuPuzzle with engine='dlx').
+
+The exact cover matrix of a Sudoku puzzle has -
+    729 rows --> one for every label (other than '') in every cell, row
+                 number cell * 9 + (index of the label in Labels - 1).
+    324 columns --> one for every constraint of the game -
+        1. every cell has a label (columns 0 to 80),
+        2. every row has every label (columns 81 to 161),
+        3. every col has every label (columns 162 to 242),
+        4. every box has every label (columns 243 to 323).
+Every row has exactly 4 1's (one in each of the above groups of columns),
+and a solution is a set of 81 rows having exactly one 1 in every column.
+
+The matrix is kept as dancing links in flat lists (one list per link, the
+nodes being the indexes of these lists) rather than as node objects, as
+this is a lot faster in python.
+"""
+
+__author__ = u"पुष्पक दगड़े (Pushpak Dagade)"
+
+from logic import Labels, GetLabelIndex
+
+ColumnsCount = 324
+RowsCount = 729
+
+
+def GetRowColumns(row):
+    """Return the 4 columns having a 1 in 'row' of the matrix."""
+    cell = row / 9
+    index = row % 9
+    puzzlerow = cell / 9
+    puzzlecol = cell % 9
+    box = puzzlerow / 3 * 3 + puzzlecol / 3
+    return (cell, 81 + puzzlerow * 9 + index, 162 + puzzlecol * 9 + index,
+            243 + box * 9 + index)
+
+
+def _BuildMatrix():
+    """Return the links of the (complete) exact cover matrix -
+    (Left, Right, Up, Down, Column, Row, Size).
+
+    Node 0 is the root, nodes 1 to 324 are the column headers (node
+    column + 1 for 'column') and the rest are the 1's of the matrix, row
+    after row.
+    """
+    headers = ColumnsCount + 1
+    Left = [headers - 1] + range(headers - 1)
+    Right = range(1, headers) + [0]
+    Up = range(headers)
+    Down = range(headers)
+    Column = range(headers)
+    Row = [-1] * headers
+    Size = [0] * headers
+
+    for row in xrange(RowsCount):
+        first = len(Left)
+        for i, column in enumerate(GetRowColumns(row)):
+            node = first + i
+            header = column + 1
+            # link into the row (circular, of 4 nodes)
+            Left.append(first + (i + 3) % 4)
+            Right.append(first + (i + 1) % 4)
+            # link at the bottom of the column
+            Up.append(Up[header])
+            Down.append(header)
+            Down[Up[header]] = node
+            Up[header] = node
+            Column.append(header)
+            Row.append(row)
+            Size[header] += 1
+
+    return Left, Right, Up, Down, Column, Row, Size
+
+
+# Built only once, every DancingLinks instance works on its own copy.
+Matrix = _BuildMatrix()
+
+
+class DancingLinks(object):
+    """The exact cover matrix of a Sudoku puzzle, along with the Algorithm X
+    search on it."""
+
+    def __init__(self):
+        (self.Left, self.Right, self.Up, self.Down, self.Column, self.Row,
+         self.Size) = [links[:] for links in Matrix]
+        self.Solution = []
+
+    def Cover(self, header):
+        """Remove the column 'header' from the matrix, along with all the
+        rows having a 1 in it."""
+        Left = self.Left
+        Right = self.Right
+        Up = self.Up
+        Down = self.Down
+        Column = self.Column
+        Size = self.Size
+
+        Right[Left[header]] = Right[header]
+        Left[Right[header]] = Left[header]
+        i = Down[header]
+        while i != header:
+            j = Right[i]
+            while j != i:
+                Down[Up[j]] = Down[j]
+                Up[Down[j]] = Up[j]
+                Size[Column[j]] -= 1
+                j = Right[j]
+            i = Down[i]
+
+    def Uncover(self, header):
+        """Undo Cover(header) (in the exact reverse order)."""
+        Left = self.Left
+        Right = self.Right
+        Up = self.Up
+        Down = self.Down
+        Column = self.Column
+        Size = self.Size
+
+        i = Up[header]
+        while i != header:
+            j = Left[i]
+            while j != i:
+                Size[Column[j]] += 1
+                Down[Up[j]] = j
+                Up[Down[j]] = j
+                j = Left[j]
+            i = Up[i]
+        Right[Left[header]] = header
+        Left[Right[header]] = header
+
+    def SelectRow(self, row):
+        """Put 'row' in the solution, covering its 4 columns.
+
+        Return 0 (selecting nothing) if any of them is already covered, ie
+        if 'row' conflicts with a row selected before, else return 1.
+        """
+        headers = [column + 1 for column in GetRowColumns(row)]
+        Left = self.Left
+        Right = self.Right
+        for header in headers:
+            # (a covered header is no longer linked in between its
+            # neighbours)
+            if Right[Left[header]] != header:
+                return 0
+        for header in headers:
+            self.Cover(header)
+        self.Solution.append(row)
+        return 1
+
+    def Search(self):
+        """Cover all the remaining columns by selecting rows (Algorithm X),
+        always branching on the column having the fewest rows left.
+
+        Return 1 (leaving the selected rows in the attribute Solution) if
+        it is possible else return 0.
+        """
+        Right = self.Right
+        Left = self.Left
+        Down = self.Down
+        Column = self.Column
+        Size = self.Size
+
+        if Right[0] == 0:
+            return 1
+
+        # minimum column heuristic
+        header = Right[0]
+        size = Size[header]
+        j = Right[header]
+        while j != 0 and size > 1:
+            if Size[j] < size:
+                header = j
+                size = Size[j]
+            j = Right[j]
+        if size == 0:
+            return 0
+
+        self.Cover(header)
+        i = Down[header]
+        while i != header:
+            self.Solution.append(self.Row[i])
+            j = Right[i]
+            while j != i:
+                self.Cover(Column[j])
+                j = Right[j]
+
+            if self.Search():
+                return 1
+
+            j = Left[i]
+            while j != i:
+                self.Uncover(Column[j])
+                j = Left[j]
+            self.Solution.pop()
+            i = Down[i]
+        self.Uncover(header)
+        return 0
+
+
+def SolveSudokuPuzzle(str_input_puzzle):
+    """
+    Solve the puzzle in the string str_input_puzzle and return the solution
+    puzzle (as a string), in the same format as logic.SolveSudokuPuzzle.
+
+    If the puzzle has no solution, it is returned as it is (except for
+    labels not in Labels, which are returned as empty cells).
+    """
+    puzzle = [''] * 81
+    links = DancingLinks()
+    consistent = 1
+    for cell, ch in enumerate(str_input_puzzle.split()):
+        if ch == '.':
+            continue
+        index = GetLabelIndex(ch)
+        if index <= 0:
+            continue
+        puzzle[cell] = ch
+        if not links.SelectRow(cell * 9 + index - 1):
+            consistent = 0
+
+    if consistent and links.Search():
+        for row in links.Solution:
+            puzzle[row / 9] = Labels[row % 9 + 1]
+
+    return ''.join([(label or '.') + ' ' for label in puzzle])
@@ -0,0 +1,145 @@
+#!/usr/bin/python -u
+# -*- coding: UTF-8 -*-
+
+"""Generating new Sudoku puzzles, using the solver of the module logic.
+
+A puzzle is generated in 2 steps -
+    1. A random complete puzzle is made, by filling an empty puzzle the
+       same way as Solver.CountSolutions searches it, but trying the
+       permissible labels of every cell in a random order.
+    2. Clues (filled cells) are removed from it, in a random order, as long
+       as the puzzle is left with a unique solution.
+
+All this is done on a single Solver, so removing a clue costs only the
+changes it makes to the puzzle (and putting it back, if it has to be, is
+just undoing them, see Solver.LoadPuzzle), rather than solving the puzzle
+from scratch.
+
+Usage: python generator.py [number of puzzles] [seed] [symmetry] [clues]
+prints the puzzles (one per line) and the number generated per second.
+"""
+
+__author__ = u"पुष्पक दगड़े (Pushpak Dagade)"
+
+import random
+import sys
+import time
+
+from logic import Solver, NullTrace
+
+# Symmetries which the clues of a puzzle can be made to have. Every one of
+# them gives the cells which have to be removed along with a cell.
+Symmetries = {
+    'none': lambda cell: (cell,),
+    # 180 degree rotation about the center of the puzzle
+    'rotational': lambda cell: (cell, 80 - cell),
+    # reflection about the middle col
+    'mirror': lambda cell: (cell, cell / 9 * 9 + 8 - cell % 9),
+    # reflection about the main diagonal
+    'diagonal': lambda cell: (cell, cell % 9 * 9 + cell / 9),
+}
+
+
+def _FillRandomly(solver, rnd):
+    """Fill the puzzle of 'solver' completely, trying the permissible labels
+    of every cell in a random order (using 'rnd', a random.Random). Return 1
+    if it could be filled, else return 0 (leaving it as it was)."""
+    initialpuzzle = solver.SavePuzzle()
+    solver.PropagateSingles(stop_on_contradiction=True)
+    if solver.ContradictedCellsCount or solver.HomelessLabelsCount:
+        solver.LoadPuzzle(initialpuzzle)
+        return 0
+    if solver.isPuzzleComplete():
+        return 1
+
+    cell = solver.GetFewestCandidatesCell()
+    labels = solver.GetPermissibleLabels(cell / 9, cell % 9, 9)
+    rnd.shuffle(labels)
+    assumption = solver.SavePuzzle()
+    for label in labels:
+        solver.setSudokuCellLabel(cell / 9, cell % 9, label)
+        if _FillRandomly(solver, rnd):
+            return 1
+        solver.LoadPuzzle(assumption)
+    solver.LoadPuzzle(initialpuzzle)
+    return 0
+
+
+def GenerateCompletePuzzle(rnd):
+    """Return a random complete puzzle (as a string, in the format of
+    logic.Solver.WritePuzzleToString), using 'rnd' (a random.Random)."""
+    solver = Solver(hidden_singles='all', trace=NullTrace())
+    _FillRandomly(solver, rnd)
+    return solver.WritePuzzleToString()
+
+
+def GeneratePuzzle(rnd=None, symmetry='none', clues=0):
+    """
+    Return a new puzzle having a unique solution (as a string, in the
+    format of logic.Solver.WritePuzzleToString).
+
+    rnd --> a random.Random (or a seed for one), a new one if None.
+    symmetry --> one of the keys of Symmetries. The clues of the puzzle
+                 are removed together with their symmetric ones, so that
+                 the puzzle keeps the symmetry.
+    clues --> stop removing clues once the puzzle has no more than 'clues'
+              clues. With 0 (the default), clues are removed until none
+              can be removed (along with its symmetric ones) any longer, ie
+              the puzzle is reduced to a minimal one.
+    """
+    if not isinstance(rnd, random.Random):
+        rnd = random.Random(rnd)
+    Symmetric = Symmetries[symmetry]
+
+    solver = Solver(hidden_singles='all', trace=NullTrace())
+    solver.ReadPuzzleFromString(GenerateCompletePuzzle(rnd))
+
+    cells = range(81)
+    rnd.shuffle(cells)
+    count = 81
+    for cell in cells:
+        if count <= clues:
+            break
+        group = [cell_ for cell_ in set(Symmetric(cell))
+                 if not solver.IsCellEmpty(cell_ / 9, cell_ % 9)]
+        if not group:
+            # (already removed along with a symmetric cell)
+            continue
+
+        # Removing clues can only add to the solutions of a puzzle, so a
+        # clue which cannot be removed now cannot be removed later on
+        # either. Hence, every clue needs to be tried only once.
+        withclues = solver.SavePuzzle()
+        for cell_ in group:
+            solver.setSudokuCellLabel(cell_ / 9, cell_ % 9, '')
+        if solver.CountSolutions(2) == 1:
+            count -= len(group)
+        else:
+            solver.LoadPuzzle(withclues)
+
+    return solver.WritePuzzleToString()
+
+
+def GeneratePuzzles(number, seed=None, symmetry='none', clues=0):
+    """Return a list of 'number' new puzzles, generated one after the other
+    with the same random.Random (seeded with 'seed'). See GeneratePuzzle
+    for the rest of the arguments."""
+    rnd = random.Random(seed)
+    return [GeneratePuzzle(rnd, symmetry, clues)
+            for _ in xrange(number)]
+
+
+if __name__ == "__main__":
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    symmetry = sys.argv[3] if len(sys.argv) > 3 else 'none'
+    clues = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+
+    start = time.time()
+    puzzles = GeneratePuzzles(number, seed, symmetry, clues)
+    elapsed = time.time() - start
+
+    for puzzle in puzzles:
+        print puzzle.replace(' ', '')
+    print "[%d puzzles in %.2f sec. (%.1f puzzles per sec.)]" \
+          % (number, elapsed, number / elapsed)
@@ -17,11 +17,17 @@ Solving a Sudoku puzzle requires two approaches -
        things more complicated.
 
     To see the steps taken in solving, refer to documentations of the
-        functions Step1 and Stepk
+        methods Step1 and Stepk of the class Solver.
+
+All the state of a solve lives in an instance of the class Solver. The module
+level functions are thin wrappers around a module level Solver (except for
+SolveSudokuPuzzle, which uses a new Solver for every puzzle).
 
 Note: This module is completely independent , ie it does not depends on any
 function/attribute defined in any other modules
 (unlike in its previous version --> Sudoku Solver 1.0)
+(The only exception is SolveSudokuPuzzle with engine='dlx', which uses the
+module dlx.)
 
 """
 
@@ -36,563 +42,2401 @@ __date__ = "Jul 17, 2011 9:49:42 PM"
 # function PrintPuzzle()).
 
 
-# TODOS:
-# 1. printing directly to stdout is not be the best way. Need to make it
-#    flexible, ie. should allow printing to stdout or a file or txtbrwSolutions
-#    but, without, compromising on the speed (use "timeit" to characterise).
+# The solution is written to the trace of the Solver (see NullTrace,
+# BufferTrace and StreamTrace) and not printed directly to stdout, so that it
+# can go to stdout or a file or txtbrwSolutions, or be skipped altogether
+# (without paying for putting it together).
 
-from copy import deepcopy
+import random
+import sys
+import time
+from array import array
+from collections import deque
+from itertools import combinations
+from types import GeneratorType
 
-SudokuPuzzle = [[''] * 9 for i in xrange(9)]                # an empty puzzle
-LabelRestrictionsCount = [[[0] * 10 for i in xrange(9)] for j in xrange(9)]
 Labels = ('', '1', '2', '3', '4', '5', '6', '7', '8', '9')
 
+# The permissible labels of a cell are kept as a 9 bit integer (a "candidates
+# mask"), bit (i - 1) standing for Labels[i]. '' (empty string) gets no bit as
+# it is always permissible.
+AllLabelsMask = 0x1FF
+LabelBits = dict((Labels[i], (1 << i) >> 1) for i in xrange(10))
+# Lookup tables indexed by a candidates mask -
+# 1. BitCount --> number of labels in the mask.
+# 2. LowestLabelIndex --> index (in Labels) of the 1st label in the mask
+#    (0 ie '' for an empty mask).
+BitCount = tuple([bin(mask).count('1') for mask in xrange(512)])
+LowestLabelIndex = tuple([(mask & -mask).bit_length() for mask in xrange(512)])
+
+# Cells are numbered 0 to 80 row after row (cell = row * 9 + col).
+# Units are numbered 0 to 26 - the 9 rows, followed by the 9 cols and the
+# 9 boxes. These tables are built once, so that the row / 3 * 3 kind of
+# arithmetic is not needed while solving -
+# 1. Units --> the 9 cells of every unit.
+# 2. CellUnits --> the row, col and box (units) of every cell.
+# 3. Peers --> the 20 cells sharing a row, col or box with every cell.
+Units = tuple([tuple([row * 9 + col for col in xrange(9)])
+               for row in xrange(9)] +
+              [tuple([row * 9 + col for row in xrange(9)])
+               for col in xrange(9)] +
+              [tuple([(box / 3 * 3 + i / 3) * 9 + box % 3 * 3 + i % 3
+                      for i in xrange(9)])
+               for box in xrange(9)])
+CellUnits = tuple([(cell / 9, 9 + cell % 9, 18 + cell / 27 * 3 + cell % 9 / 3)
+                   for cell in xrange(81)])
+Peers = tuple([tuple(sorted(set([peer for unit in CellUnits[cell]
+                                 for peer in Units[unit]]) - set([cell])))
+               for cell in xrange(81)])
+# 4. CellPlaces --> (unit, place) for the row, col and box of every cell,
+#    place being the bit standing for the position of the cell in the unit.
+CellPlaces = tuple([tuple([(unit, 1 << Units[unit].index(cell))
+                           for unit in CellUnits[cell]])
+                    for cell in xrange(81)])
+# 5. Intersections --> (box, line, box places, line places) for each of the
+#    54 intersections of a box with a row or col passing through it, the
+#    places being those of the 3 cells of the intersection in the box and
+#    in the line (row or col).
+Intersections = tuple([(box, line,
+                        sum([1 << Units[box].index(cell)
+                             for cell in Units[box] if cell in Units[line]]),
+                        sum([1 << Units[line].index(cell)
+                             for cell in Units[line] if cell in Units[box]]))
+                       for box in xrange(18, 27)
+                       for line in sorted(set([unit for cell in Units[box]
+                                               for unit in CellUnits[cell]
+                                               if unit < 18]))])
+# 6. PeerMasks --> the peers of every cell as a bitmask (bit 'peer' for
+#    'peer').
+PeerMasks = tuple([sum([1 << peer for peer in Peers[cell]])
+                   for cell in xrange(81)])
+# 7. Rectangles --> the 4 cells (corners) of every rectangle of 2 rows and 2
+#    cols lying in exactly 2 boxes, as (row1 col1, row1 col2, row2 col1,
+#    row2 col2).
+Rectangles = tuple([(row1 * 9 + col1, row1 * 9 + col2,
+                     row2 * 9 + col1, row2 * 9 + col2)
+                    for row1, row2 in combinations(xrange(9), 2)
+                    for col1, col2 in combinations(xrange(9), 2)
+                    if (row1 / 3 == row2 / 3) != (col1 / 3 == col2 / 3)])
+
+
+def _BuildLineRectangles():
+    """Return the rectangles (see Rectangles) having both cells of every
+    pair of cells in a row or col, by the pair (as (cell1, cell2), cell1 <
+    cell2)."""
+    line_rectangles = {}
+    for rectangle in Rectangles:
+        for cell1, cell2 in combinations(rectangle, 2):
+            if cell1 / 9 == cell2 / 9 or cell1 % 9 == cell2 % 9:
+                line_rectangles.setdefault((cell1, cell2),
+                                           []).append(rectangle)
+    return line_rectangles
+
+
+# 8. LineRectangles --> see _BuildLineRectangles.
+LineRectangles = _BuildLineRectangles()
+
+
+def _BuildZobristKeys():
+    """Return a random 64 bit key for every label (at cell * 10 + index of
+    the label in Labels) of every cell, 0 for ''. Always the same keys, so
+    that the hashes (see Solver.Hash) are the same from run to run."""
+    rnd = random.Random(0)
+    return tuple([index and rnd.getrandbits(64)
+                  for cell in xrange(81) for index in xrange(10)])
+
+
+# 9. ZobristKeys --> see _BuildZobristKeys.
+ZobristKeys = _BuildZobristKeys()
+
+# Most strong links followed in a chain, from its start (see
+# Solver.EliminateChains).
+MaxChainLength = 6
+# Most assumptions a nogood can depend on, longer ones are not recorded (see
+# Solver._RecordNogood).
+MaxNogoodSize = 3
+
+# Kinds of changes recorded in the trail (Solver.Trail) -
+# (LabelChange, cell, old label, new label)
+# (CandidatesChange, cell, old candidates mask, new candidates mask)
+LabelChange = 0
+CandidatesChange = 1
+
+# Results of the assumptions recorded in the transposition table
+# (Solver.Transpositions) -
+Contradiction = 0                   # the assumption was definately incorrect
+Solution = 1                        # the assumption solved the puzzle
+Undecided = 2                       # nothing could be said about it
+
+# Returned by a pass of Stepk (see Solver._StepkPass) when the puzzle has moved
+# a step ahead, and the pass is to be made all over again.
+RestartStepk = -1
+
+# Status of a solve (Solver.Status) -
+Solved = 0                          # the puzzle got solved
+Unsolved = 1                        # the puzzle could not be solved
+BudgetExceeded = 2                  # a limit was reached (see Solver.__init__)
+Cancelled = 3                       # the solve was cancelled (see CancelToken)
 
-def ReadPuzzleFromString(str_puzzle):
-    """
-    Read the puzzle from the string str_puzzle, and store it as
-    a 2D array of characters in the variable SudokuPuzzle.
 
-    (Note. str_puzzle will have empty cells represented as '.').
-    However, store '.' in str_puzzle as '' (empty character)
-    in the array SudokuPuzzle (why to waste space unnecessarily?)
+def GetLabelIndex(label):
     """
-    for i, ch in enumerate(str_puzzle.split()):
-        row = i / 9
-        col = i % 9
-        if ch == '.':
-            setSudokuCellLabel(row, col, '')
-        else:
-            setSudokuCellLabel(row, col, ch)
+    Search for label in the global constant Labels and return its
+    corresponding index. If not found, return -1 (it is up to the caller to
+    tell so, see Solver.setSudokuCellLabel).
+    """
+    try:
+        return Labels.index(label)
+    except ValueError:
+        return -1
 
 
-def WritePuzzleToString():
-    """
-    Write the puzzle in the 2D array SudokuPuzzle to the string str_puzzle
-    converting empty cells (ie cells containing '') to '.' in the string.
-    """
-    str_solution_puzzle = ""
+# Events - the steps of a solution, as written to a trace (see below). Every
+# event has a code (its index in Events), the text it is written as and the
+# kinds of its arguments (one character per argument) -
+#   n --> a number.
+#   l --> a label.
+#   t --> an assumption tree (a list of numbers, see Stepk).
+#   s --> any string.
+#   r --> the rule by which a cell got filled (1 or 2, the algorithm of
+#         Step1 used), which is not written in the text.
+Events = (
+    ("%s", 's'),
+    ("=========================\n", ''),
+    ("[Max Assumptions: %d]\n\n", 'n'),
+    ("[Trouble] Failed setting label-\n %s in cell (%d,%d)\n\n", 'lnn'),
+    ("Solving exactly...\n", ''),
+    ("(%d,%d) --> %s\n", 'nnlr'),
+    ("Puzzle complete?\n", ''),
+    ("> Complete!\n", ''),
+    ("> Not yet!\n", ''),
+    ("\n(New Assumption Level.\nAssumption Tree: %s\nSaving puzzle...)\n\n",
+     't'),
+    ("Assuming %s in cell (%d,%d)\n\n", 'lnn'),
+    ("Assuming %s in cell (%d,%d)\n[Other can be %s]\n\n", 'lnnl'),
+    ("Assumption correct?\n", ''),
+    ("Maybe. Going deeper...\n\n", ''),
+    ("Definately incorrect!\n[%s in cell (%d,%d)]\n\n", 'lnn'),
+    ("No label fits in cell\n(%d,%d). Going back.\nAssumption Tree: %s\n\n",
+     'nnt'),
+    ("(Entering into nested\nassumption...)\n\n", ''),
+    ("(Exiting from nested\nassumption...)\n\n", ''),
+    ("> Not yet!\n\nAssumption correct?\n", ''),
+    ("Maybe. Can't say anything\nas of now. Assumption was\n"
+     "%s in (%d,%d)\n\n", 'lnn'),
+    ("Saving the above puzzle.\nWill be useful if other\n"
+     "assumption (on same cell)\nis definitely incorrect.\n\n", ''),
+    ("Reverting to this puzzle\n(saved at the beginning \n"
+     "of this assumption) -\n", ''),
+    ("Hence previous assumption\nwas correct - \n[%s in cell (%d,%d)]\n"
+     "Revert to the its\nsolution puzzle. \n(Good, I had saved it!\n"
+     "Saved my time!)\n", 'lnn'),
+    ("Hence, defintely correct-\n[%s in cell (%d,%d)]\n\n", 'lnn'),
+    ("Didn't get anything from\nthis Assumption Level.\n"
+     "Assumption Tree: %s\n\n", 't'),
+    ("Naked/hidden subsets -\n%d candidates removed\n", 'n'),
+    ("Locked candidates -\n%d candidates removed\n", 'n'),
+    ("X-Wing/Swordfish/Jellyfish\n%d candidates removed\n", 'n'),
+    ("Alternating chains -\n%d candidates removed\n", 'n'),
+    ("Uniqueness -\n%d candidates removed\n", 'n'),
+    ("(Seen this puzzle before\nat this level.)\n", ''),
+    ("Known to be incorrect -\n%d candidates removed\n", 'n'),
+    ("[Max Assumptions: as\nmany as needed]\n\n", ''),
+    ("(Out of budget for more\nassumption levels.\n"
+     "Searching instead...)\n\n", ''),
+    ("[Out of budget - solving\nstopped midway]\n\n", ''),
+    ("[Cancelled - solving\nstopped midway]\n\n", ''),
+    ("(Searching instead...)\n\n", ''),
+)
+(TextEvent, LineEvent, MaxAssumptionsEvent, TroubleEvent, SolvingExactlyEvent,
+ FillEvent, CompleteQuestionEvent, CompleteEvent, NotCompleteEvent,
+ AssumptionLevelEvent, AssumingEvent, AssumingOneOfTwoEvent,
+ CorrectQuestionEvent, GoingDeeperEvent, IncorrectEvent, NoLabelFitsEvent,
+ EnteringNestedEvent, ExitingNestedEvent, NotCompleteCorrectQuestionEvent,
+ MaybeCorrectEvent, SavingEvent, RevertingEvent, PreviousCorrectEvent,
+ OtherCorrectEvent, NothingFromLevelEvent, SubsetsEvent,
+ LockedCandidatesEvent, FishEvent, ChainsEvent,
+ UniquenessEvent, TranspositionEvent, NogoodsEvent, AdaptiveAssumptionsEvent,
+ SearchingInsteadEvent, BudgetExceededEvent,
+ CancelledEvent, SearchingEvent) = xrange(len(Events))
+# (The code of the event of a printed puzzle, which has its own method in
+# traces.)
+BoardEvent = len(Events)
+# Number of arguments written in the text of every event.
+EventTextArgsCount = tuple([len(kinds.rstrip('r')) for text, kinds in Events])
+
+
+def RenderPuzzle(puzzle):
+    """Return the puzzle 'puzzle' (a list of 81 labels, as the attribute
+    SudokuPuzzle of Solver) in nice readable format."""
+    sep = "+-------+-------+-------+"
+    lines = ["", sep]
     for row in xrange(9):
-        for col in xrange(9):
-            if (SudokuPuzzle[row][col] == ''):
-                str_solution_puzzle += '.'
-            else:
-                str_solution_puzzle += SudokuPuzzle[row][col]
-            str_solution_puzzle += ' '
+        # print empty cells as '.'
+        labels = [label or '.' for label in puzzle[row * 9:row * 9 + 9]]
+        lines.append("| %s | %s | %s |" % (' '.join(labels[0:3]),
+                                           ' '.join(labels[3:6]),
+                                           ' '.join(labels[6:9])))
+        if (row == 2 or row == 5):
+            lines.append(sep)
+    lines.append(sep)
+    lines.append("\n")
+    return '\n'.join(lines)
 
-    return str_solution_puzzle
 
+# Traces - where a Solver writes the solution (the explanation of how the
+# puzzle got solved) to. They all have -
+# 1. the attribute enabled --> 0 if whatever is written is thrown away
+#    (so that it need not be put together at all), else 1.
+# 2. the method event(code, *args) --> write the event 'code' (see Events)
+#    with the arguments 'args'.
+# 3. the method board(puzzle) --> write the puzzle 'puzzle' (see
+#    RenderPuzzle).
+# 4. the method write(text, args=()) --> write 'text', formatted with 'args'
+#    (text % args) if there are any.
+# The formatting is left to the trace, so that NullTrace can skip it and
+# EventLog can do without it.
 
-def PrintPuzzle():
+class NullTrace(object):
+    """A trace throwing away whatever is written to it. Solving with it
+    costs nothing for the solution."""
+
+    enabled = 0
+
+    def write(self, text, args=()):
+        pass
+
+    def event(self, code, *args):
+        pass
+
+    def board(self, puzzle):
+        pass
+
+
+class TextTrace(object):
+    """Base class of the traces writing the solution as text (the subclasses
+    only need to define the method write)."""
+
+    enabled = 1
+
+    def event(self, code, *args):
+        self.write(Events[code][0], args[:EventTextArgsCount[code]])
+
+    def board(self, puzzle):
+        self.write(RenderPuzzle(puzzle))
+
+
+class BufferTrace(TextTrace):
+    """A trace keeping whatever is written to it in memory (see getvalue)."""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, text, args=()):
+        if args:
+            text = text % args
+        self.parts.append(text)
+
+    def getvalue(self):
+        """Return all that is written so far, as a string."""
+        return ''.join(self.parts)
+
+
+class StreamTrace(TextTrace):
+    """A trace writing to a file (or any object having a write method).
+
+    If no stream is given, whatever sys.stdout is at the time of writing is
+    written to (as the print statements of the previous versions did).
     """
-    Print the puzzle stored in the variable SudokuPuzzle in nice
-    readable format.
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def write(self, text, args=()):
+        if args:
+            text = text % args
+        (self.stream or sys.stdout).write(text)
+
+
+class EventLog(object):
+    """A trace keeping the events written to it (and not their text) in an
+    array of (long) integers, in the order they are written. For every
+    event, its code is followed by its arguments -
+        a number --> as it is.
+        a label --> its index in Labels (or 10 + its index in the attribute
+                    Strings, if not in Labels).
+        a string --> its index in Strings.
+        an assumption tree --> its length followed by its numbers.
+        a puzzle (BoardEvent) --> number of cells changed since the previous
+                    puzzle written, followed by the cell and the index of the
+                    label (in Labels) of every one of them.
+
+    This costs a few bytes per event, rather than the length of its text (a
+    puzzle costs 2 integers per changed cell, rather than 338 characters),
+    for example 70 KB rather than 119 KB for the puzzle of "Sample
+    Solution". (Long integers, so that no string index nor number written
+    can be too large for the array.)
+    The text is put together only on asking for it (see ReplayEvents and
+    getvalue), the same as it would have been by a BufferTrace.
     """
-    # (Performance of this funtion is crucial to the performance of this app.)
-    # (Try improving it.)
-    sep = "+-------+-------+-------+"
-    print "\n%s" % sep
-    for row in xrange(9):
-        print "|",
-        for col in xrange(9):
-            if (SudokuPuzzle[row][col] == ''):
-                print ".",                           # print empty cells as '.'
+
+    enabled = 1
+
+    def __init__(self):
+        self.Codes = array('l')
+        self.Strings = []
+        # The puzzle as of the last BoardEvent.
+        self.Puzzle = [''] * 81
+
+    def write(self, text, args=()):
+        if args:
+            text = text % args
+        self.event(TextEvent, text)
+
+    def event(self, code, *args):
+        codes = self.Codes
+        codes.append(code)
+        for kind, arg in zip(Events[code][1], args):
+            if kind == 'l':
+                if arg in LabelBits:
+                    codes.append(Labels.index(arg))
+                else:
+                    codes.append(10 + len(self.Strings))
+                    self.Strings.append(arg)
+            elif kind == 's':
+                codes.append(len(self.Strings))
+                self.Strings.append(arg)
+            elif kind == 't':
+                codes.append(len(arg))
+                codes.extend(arg)
             else:
-                print "%s" % SudokuPuzzle[row][col],
-            if (col == 2 or col == 5):
-                print "|",
-        print "|"
-        if (row == 2 or row == 5):
-            print sep
-    print "%s\n" % sep
+                codes.append(arg)
+
+    def board(self, puzzle):
+        codes = self.Codes
+        previous = self.Puzzle
+        changed = [cell for cell in xrange(81)
+                   if puzzle[cell] != previous[cell]]
+        codes.append(BoardEvent)
+        codes.append(len(changed))
+        for cell in changed:
+            codes.append(cell)
+            codes.append(Labels.index(puzzle[cell]))
+        self.Puzzle = puzzle[:]
+
+    def getvalue(self):
+        """Return the text of all the events written so far, as a string."""
+        buffer = BufferTrace()
+        ReplayEvents(self, buffer)
+        return buffer.getvalue()
+
+
+def ReplayEvents(log, trace):
+    """Write the events kept in the EventLog 'log' to 'trace' (any trace),
+    in the same order as they were written to 'log'."""
+    codes = log.Codes
+    strings = log.Strings
+    puzzle = [''] * 81
+    i = 0
+    while i < len(codes):
+        code = codes[i]
+        i += 1
+        if code == BoardEvent:
+            for j in xrange(i + 1, i + 1 + 2 * codes[i], 2):
+                puzzle[codes[j]] = Labels[codes[j + 1]]
+            i += 1 + 2 * codes[i]
+            trace.board(puzzle)
+            continue
+        args = []
+        for kind in Events[code][1]:
+            arg = codes[i]
+            i += 1
+            if kind == 'l':
+                arg = Labels[arg] if arg < 10 else strings[arg - 10]
+            elif kind == 's':
+                arg = strings[arg]
+            elif kind == 't':
+                arg, i = list(codes[i:i + arg]), i + arg
+            args.append(arg)
+        trace.event(code, *args)
 
 
-def GetLabelIndex(label):
-    """
-    Search for label in the global constant Labels and return its
-    corresponding index. If not found, return -1.
-    """
-    try:
-        return Labels.index(label)
-    except ValueError:
-        print "![Trouble] label: '%s' not in global const Labels!" % label
-        return -1
+class CancelToken(object):
+    """Lets a solve be cancelled from another thread - pass it to the Solver
+    (see Solver.__init__) and call cancel(). The solve stops at the next
+    check of Step1, Stepk or Search, with the status Cancelled."""
 
+    def __init__(self):
+        self.cancelled = False
 
-def isPuzzleComplete():
-    """
-    Return 1 if puzzle is complete and 0 if not complete.
+    def cancel(self):
+        self.cancelled = True
+
+
+class LevelsBudgetSpent(Exception):
+    """Raised by Stepk (and caught by Solver._SolveAdaptively) once the
+    budget of the assumption levels raised with MaxAssumptionLevel None is
+    spent."""
+
+
+class SolveInterrupted(Exception):
+    """Raised (and caught by Solver.SolveSudokuPuzzle) to stop a solve
+    midway. The attribute status is BudgetExceeded or Cancelled."""
+
+    def __init__(self, status):
+        Exception.__init__(self, status)
+        self.status = status
+
+
+class Solver(object):
+    """A Sudoku puzzle together with everything needed to solve it.
 
-    Note: If puzzle is complete then it cannot be incorrect,
-    it will definately be correct (thanks to the mechanism
-    employed in the setSudokuCellLabel method of this class).
+    Every instance owns its own puzzle, candidates masks and options, so any
+    number of puzzles can be solved in the same process (even from different
+    threads) and an instance can be reused for solving one puzzle after the
+    other.
     """
-    for row in xrange(9):
-        for col in xrange(9):
-            if SudokuPuzzle[row][col] == '':
+
+    # Techniques which Step1 can use besides its 2 algorithms (see __init__)
+    # - the method applying every one of them (returning the number of
+    # candidates it removed) and the event telling so.
+    TechniqueMethods = {
+        'subsets': ('EliminateSubsets', SubsetsEvent),
+        'locked': ('EliminateLockedCandidates', LockedCandidatesEvent),
+        'fish': ('EliminateFish', FishEvent),
+        'chains': ('EliminateChains', ChainsEvent),
+        'uniqueness': ('EliminateByUniqueness', UniquenessEvent),
+    }
+
+    def __init__(self, MaxAssumptionLevel=4,
+                 hidden_singles='rows', unit_contradictions=False,
+                 branching='bivalue', trace=None, techniques=(),
+                 assume_unique=False, transpositions=0, nogoods=False,
+                 adaptive_nodes=100000, adaptive_time=10.0,
+                 time_limit=None, assignments_limit=None, nodes_limit=None,
+                 cancel=None):
+        """
+        MaxAssumptionLevel --> see SolveSudokuPuzzle. If None, the level is
+            raised one at a time, for as long as the puzzle is not solved
+            (see _SolveAdaptively).
+        hidden_singles --> units searched by the 2nd algorithm of Step1 -
+            'rows' - only rows (the default).
+            'all' - rows, cols and boxes.
+        unit_contradictions --> if True, isPuzzleCorrect also finds the
+            puzzle incorrect when a label has no place left in a row, col or
+            box (not just when an empty cell has no permissible label).
+        branching --> how assumptions are made once Step1 gets stuck -
+            'bivalue' - Stepk, on cells with exactly 2 permissible labels, up
+                        to MaxAssumptionLevel nested assumptions (the
+                        default).
+            'mrv' - Search, on the cell with the fewest permissible labels,
+                    backtracking as deep as needed (MaxAssumptionLevel is not
+                    a limit here).
+        trace --> where the solution is written to (see NullTrace,
+            BufferTrace, StreamTrace and EventLog), StreamTrace() (ie
+            sys.stdout) if None.
+        techniques --> names of the techniques (see TechniqueMethods) which
+            Step1 uses to remove candidates once its 2 algorithms have
+            nothing more to fill, tried in the given order (none by
+            default) -
+            'subsets' - naked and hidden pairs, triples and quads (see
+                        EliminateSubsets).
+            'locked' - locked candidates, pointing and claiming (see
+                       EliminateLockedCandidates).
+            'fish' - X-Wings, Swordfish and Jellyfish (see EliminateFish).
+            'chains' - alternating inference chains (see EliminateChains).
+            'uniqueness' - unique rectangles and BUG+1 (see
+                           EliminateByUniqueness), only with assume_unique.
+        assume_unique --> if True, the puzzle is taken to have a unique
+            solution, which the technique 'uniqueness' relies on (it does
+            nothing otherwise). Set it only for puzzles known to have one
+            (see CountSolutions, which never relies on it).
+        transpositions --> most puzzles kept in the transposition table of
+            Stepk (see Stepk), no table if 0 (the default).
+        nogoods --> if True, Stepk remembers the labels it finds definately
+            incorrect under other assumptions, and removes them as soon as
+            these assumptions are made again (see _RecordNogood).
+        adaptive_nodes, adaptive_time --> budget of the assumption levels
+            raised with MaxAssumptionLevel None - Stepk stops once this many
+            assumptions are made (Stats['branches']) or this many seconds
+            are taken (no time budget if None), and Search finishes the
+            puzzle instead.
+        time_limit, assignments_limit, nodes_limit --> limits of a solve by
+            SolveSudokuPuzzle (none by default) - seconds taken, cells filled
+            (by Step1 and by assumptions) and assumptions made (by Stepk or
+            Search) respectively. The solve stops once any of them is
+            reached, with the status BudgetExceeded (see SolveSudokuPuzzle).
+        cancel --> a CancelToken, to stop the solve with the status
+            Cancelled.
+        """
+        self.MaxAssumptionLevel = MaxAssumptionLevel
+        self.hidden_singles = hidden_singles
+        self.unit_contradictions = unit_contradictions
+        self.branching = branching
+        self.techniques = techniques
+        self.assume_unique = assume_unique
+        self.transpositions = transpositions
+        self.nogoods = nogoods
+        self.adaptive_nodes = adaptive_nodes
+        self.adaptive_time = adaptive_time
+        self.time_limit = time_limit
+        self.assignments_limit = assignments_limit
+        self.nodes_limit = nodes_limit
+        self.cancel = cancel
+        # Time by which a solve has to stop (None if there is no
+        # time_limit), see SolveSudokuPuzzle.
+        self.Deadline = None
+        # Status of the last solve, see SolveSudokuPuzzle.
+        self.Status = Unsolved
+        # Whether _SolveAdaptively is raising the assumption levels, and the
+        # time by which they have to stop (None if no time budget).
+        self.RaisingLevels = 0
+        self.LevelsDeadline = None
+        if trace is None:
+            trace = StreamTrace()
+        self.trace = trace
+        if hidden_singles == 'all':
+            self.HiddenSinglesUnits = range(27)
+        else:
+            self.HiddenSinglesUnits = range(9)
+        self.ClearPuzzle()
+
+    def ClearPuzzle(self):
+        """Empty the puzzle (and hence the candidates masks too)."""
+        self.SudokuPuzzle = [''] * 81                       # an empty puzzle
+        # Permissible labels of every empty cell (0 for filled cells).
+        self.CellCandidates = [AllLabelsMask] * 81
+        # Labels already placed in every unit. These play the role of the
+        # restriction counts of the previous versions - a label is restricted
+        # on a cell as long as it is placed in any of the cell's row, col or
+        # box.
+        self.UnitLabels = [0] * 27
+        # Bookkeeping kept up to date along with the above, so that checking
+        # the puzzle for completeness and for contradictions costs nothing -
+        # 1. EmptyCellsCount --> number of empty cells.
+        # 2. CandidatesCount --> number of labels in every candidates mask.
+        # 3. ContradictedCellsCount --> number of empty cells which have no
+        #    permissible label.
+        # 4. UnitPlaces --> for every unit and label (at unit * 9 + index of
+        #    label in Labels - 1), the places (see CellPlaces) of the cells
+        #    of the unit for which the label is permissible.
+        # 5. HomelessLabelsCount --> number of (unit, label) pairs for which
+        #    the label is neither placed in the unit nor permissible in any
+        #    of its cells.
+        # 6. CountCells --> for every number of permissible labels (0 to 9),
+        #    a bitmask (bit 'cell' for 'cell') of the empty cells having
+        #    that many permissible labels.
+        # 7. ConjugateUnits --> for every label (at index of label in
+        #    Labels - 1), a bitmask (bit 'unit' for 'unit') of the units in
+        #    which the label is permissible in exactly 2 cells. Along with
+        #    the cells having exactly 2 permissible labels (CountCells[2]),
+        #    these are the strong links of EliminateChains.
+        self.EmptyCellsCount = 81
+        self.CandidatesCount = [9] * 81
+        self.ContradictedCellsCount = 0
+        self.UnitPlaces = [AllLabelsMask] * 243
+        self.HomelessLabelsCount = 0
+        self.CountCells = [0] * 9 + [(1 << 81) - 1]
+        self.ConjugateUnits = [0] * 9
+        # 8. Hash --> the Zobrist hash of the labels of the puzzle (the XOR
+        #    of their ZobristKeys).
+        self.Hash = 0
+        # Every change made to the above is recorded here, so that any
+        # number of them can be undone (see SavePuzzle and LoadPuzzle).
+        self.Trail = []
+        # Results of the assumptions tried by Stepk, as (result, MaxSteps
+        # of the SolveUptoSteps trying it) by the Hash of the puzzle right
+        # after the assumption was made (None if there is no table).
+        self.Transpositions = {} if self.transpositions else None
+        # Assumptions (as (cell, label)) of the Stepk levels the puzzle is
+        # being solved in, outermost first.
+        self.Assumptions = []
+        # Marks (see SavePuzzle) of the puzzle before every assumption of
+        # Stepk and Search which is not undone yet, outermost first.
+        self.AssumptionMarks = []
+        # Nogoods --> labels found definately incorrect by Stepk, along with
+        # the assumptions they were found under, as (assumptions, cell,
+        # label) by every one of these assumptions.
+        self.Nogoods = {}
+        # What it took to solve the puzzle so far (see GradePuzzle), counting
+        # what got undone later on too -
+        # 1. naked_singles, hidden_singles --> number of cells filled by the
+        #    1st and the 2nd algorithm of Step1 respectively.
+        # 2. branches --> number of assumptions made (by Stepk or Search).
+        # 3. max_depth --> most assumptions ever nested (1 for an assumption
+        #    made with no other one made before it).
+        # 4. contradictions --> number of assumptions found definately
+        #    incorrect.
+        # 5. assumption_levels --> number of assumption levels entered (by
+        #    Stepk or Search), each saving the puzzle once.
+        # 6. naked_subsets, hidden_subsets --> number of subsets which
+        #    removed candidates (see EliminateSubsets).
+        # 7. pointing, claiming --> number of intersections at which locked
+        #    candidates removed candidates (see EliminateLockedCandidates).
+        # 8. x_wings, swordfish, jellyfish --> number of fish (of 2, 3 and 4
+        #    rows or cols respectively) which removed candidates (see
+        #    EliminateFish).
+        # 9. chains --> number of chains which removed candidates (see
+        #    EliminateChains).
+        # 10. unique_rectangles, bug_plus_one --> number of unique
+        #     rectangles and BUG+1 which removed candidates (see
+        #     EliminateByUniqueness).
+        # 11. transpositions --> number of assumptions whose result was
+        #     taken from the transposition table (see Stepk).
+        # 12. nogoods --> number of candidates removed using nogoods (see
+        #     _ApplyNogoods).
+        # 13. needed_level, searched --> the assumption level raised to, and
+        #     1 if Search had to finish the puzzle, with MaxAssumptionLevel
+        #     None (see _SolveAdaptively).
+        self.Stats = dict.fromkeys(['naked_singles', 'hidden_singles',
+                                    'branches', 'max_depth',
+                                    'contradictions', 'assumption_levels',
+                                    'naked_subsets', 'hidden_subsets',
+                                    'pointing', 'claiming', 'x_wings',
+                                    'swordfish', 'jellyfish', 'chains',
+                                    'unique_rectangles', 'bug_plus_one',
+                                    'transpositions', 'nogoods',
+                                    'needed_level', 'searched'], 0)
+        # Cells filled (by Step1 and by assumptions) since the puzzle was
+        # cleared, counted against assignments_limit (see
+        # _CountAssignment).
+        self.Assignments = 0
+
+    def ReadPuzzleFromString(self, str_puzzle):
+        """
+        Read the puzzle from the string str_puzzle, and store it as
+        an array of characters (row after row) in the attribute SudokuPuzzle.
+
+        (Note. str_puzzle will have empty cells represented as '.').
+        However, store '.' in str_puzzle as '' (empty character)
+        in the array SudokuPuzzle (why to waste space unnecessarily?)
+
+        Return 1 if every label could be set, else return 0 (a label not in
+        Labels, or clashing with a label read before, is left out).
+        """
+        consistent = 1
+        for i, ch in enumerate(str_puzzle.split()):
+            row = i / 9
+            col = i % 9
+            if ch == '.':
+                self.setSudokuCellLabel(row, col, '')
+            elif not self.setSudokuCellLabel(row, col, ch):
+                consistent = 0
+        return consistent
+
+    def WritePuzzleToString(self):
+        """
+        Write the puzzle in the array SudokuPuzzle to the string
+        str_puzzle converting empty cells (ie cells containing '') to '.' in
+        the string.
+        """
+        str_solution_puzzle = ""
+        for cell in xrange(81):
+            if (self.SudokuPuzzle[cell] == ''):
+                str_solution_puzzle += '.'
+            else:
+                str_solution_puzzle += self.SudokuPuzzle[cell]
+            str_solution_puzzle += ' '
+
+        return str_solution_puzzle
+
+    def PrintPuzzle(self):
+        """
+        Print the puzzle stored in the attribute SudokuPuzzle in nice
+        readable format.
+        """
+        # (Performance of this funtion is crucial to the performance of this
+        # app.) (So, the whole puzzle is written at once (see RenderPuzzle),
+        # and not even put together if the trace is disabled.)
+        self.trace.board(self.SudokuPuzzle)
+
+    def isPuzzleComplete(self):
+        """
+        Return 1 if puzzle is complete and 0 if not complete.
+
+        Note: If puzzle is complete then it cannot be incorrect,
+        it will definately be correct (thanks to the mechanism
+        employed in the setSudokuCellLabel method of this class).
+        """
+        return self.EmptyCellsCount == 0
+
+    def IsCellEmpty(self, row, col):
+        """Return 1 if label is '' (empty string) else return 0."""
+        return self.SudokuPuzzle[row * 9 + col] == ''
+
+    def GetPeerLabels(self, row, col):
+        """Return the candidates mask of labels placed in the row, col and
+        box of the cell in (row,col), leaving out the cell's own label."""
+        return self._GetPeerLabels(row * 9 + col)
+
+    def _GetPeerLabels(self, cell):
+        """Same as GetPeerLabels, but for a cell number."""
+        UnitLabels = self.UnitLabels
+        row, col, box = CellUnits[cell]
+        return (UnitLabels[row] | UnitLabels[col] | UnitLabels[box]) & \
+            ~LabelBits[self.SudokuPuzzle[cell]]
+
+    def IsLabelPermissible(self, row, col, label):
+        """Return 1 if 'label' is not placed in the row, col or box of the
+        cell in (row,col) else return 0.
+
+        Note: '' (empty string) is always permissible. If 'label' is not in
+        global constant 'Labels' then it is not permissible (and
+        setSudokuCellLabel writes a TroubleEvent to the trace for it).
+
+        """
+        if label not in LabelBits:
+            return 0
+        cell = row * 9 + col
+        if self.SudokuPuzzle[cell] == '':
+            return self.CellCandidates[cell] & LabelBits[label] == \
+                LabelBits[label]
+        return self._GetPeerLabels(cell) & LabelBits[label] == 0
+
+    def lenLabelsPermissible(self, row, col):
+        """Return the number of permissible labels for the cell in (row,col)
+
+        Note: '' (empty string) will always be a permissible label for any
+        cell so minimum value returned by this function will be 1.
+
+        """
+        cell = row * 9 + col
+        if self.SudokuPuzzle[cell] == '':
+            return self.CandidatesCount[cell] + 1
+        return BitCount[AllLabelsMask & ~self._GetPeerLabels(cell)] + 1
+
+    def isPuzzleCorrect(self):
+        """Return 0 if puzzle is (definately) incorrect else return 1.
+
+        Note: The name of this method is a bit disguised.
+        If it returns 1 it does not necessarily mean that puzzle is
+        correct, only it means that it seems to be correct. It is quite
+        possible that as it is solved further, you will find that it is an
+        incorrect puzzle.
+        But if it returns 0 then the puzzle is definately incorrect!
+
+        So, this method is useful only if it returns 0.
+
+        """
+        if self.unit_contradictions and self.HomelessLabelsCount:
+            return 0
+        return self.ContradictedCellsCount == 0
+
+    def GetPermissibleLabels(self, row, col, n):
+        """
+        Return at the most n permissible labels. Will NOT return ''
+        (empty str) as it will always be permissible for any cell.
+        """
+        cell = row * 9 + col
+        if self.SudokuPuzzle[cell] == '':
+            mask = self.CellCandidates[cell]
+        else:
+            mask = AllLabelsMask & ~self._GetPeerLabels(cell)
+        labels = []
+        while mask and len(labels) < n:
+            labels.append(Labels[LowestLabelIndex[mask]])
+            mask &= mask - 1                          # drop the lowest label
+        return labels
+
+    def setSudokuCellLabel(self, row, col, label):
+        """See the docstring for sudokupanel.SudokuPanel.setSudokuCellLabel
+
+        Instead of restriction counts, the labels placed in every row, col
+        and box are kept as candidates masks. On setting 'label', it is
+        removed from the candidates of the empty cells in the same row, col
+        and box. On removing the current label, it is given back to those of
+        them which do not have it placed in any of their own row, col or box.
+
+        """
+        cell = row * 9 + col
+        SudokuPuzzle = self.SudokuPuzzle
+        current_label = SudokuPuzzle[cell]
+        if label == current_label:
+            return 1
+
+        if self.IsLabelPermissible(row, col, label):
+            CellCandidates = self.CellCandidates
+            UnitLabels = self.UnitLabels
+            trail = self.Trail
+            current_bit = LabelBits[current_label]
+            bit = LabelBits[label]
+
+            trail.append((LabelChange, cell, current_label, label))
+            self._ReplaceLabel(cell, current_label, label)
+            old_candidates = CellCandidates[cell]
+            if label == '':
+                candidates = AllLabelsMask & ~self._GetPeerLabels(cell)
+            else:
+                candidates = 0
+            trail.append((CandidatesChange, cell, old_candidates, candidates))
+            self._SetCandidates(cell, candidates)
+
+            # for (empty) cells in same row, col and box (except for itself) -
+            for peer in Peers[cell]:
+                if SudokuPuzzle[peer] != '':
+                    continue
+                old_candidates = CellCandidates[peer]
+                candidates = old_candidates & ~bit
+                if current_bit:
+                    row_, col_, box_ = CellUnits[peer]
+                    if not current_bit & (UnitLabels[row_] |
+                                          UnitLabels[col_] | UnitLabels[box_]):
+                        candidates |= current_bit
+                if candidates != old_candidates:
+                    trail.append((CandidatesChange, peer,
+                                  old_candidates, candidates))
+                    self._SetCandidates(peer, candidates)
+
+            return 1
+        else:
+            self.trace.event(TroubleEvent, label, row + 1, col + 1)
+            return 0
+
+    def _ReplaceLabel(self, cell, current_label, label):
+        """Replace current_label by label in 'cell' and in the masks of
+        labels placed in its row, col and box."""
+        UnitLabels = self.UnitLabels
+        UnitPlaces = self.UnitPlaces
+        current_bit = LabelBits[current_label]
+        bit = LabelBits[label]
+        current_index = LowestLabelIndex[current_bit] - 1
+        index = LowestLabelIndex[bit] - 1
+        self.Hash ^= ZobristKeys[cell * 10 + current_index + 1] ^ \
+            ZobristKeys[cell * 10 + index + 1]
+        for unit in CellUnits[cell]:
+            UnitLabels[unit] = UnitLabels[unit] & ~current_bit | bit
+            if current_bit and not UnitPlaces[unit * 9 + current_index]:
+                self.HomelessLabelsCount += 1
+            if bit and not UnitPlaces[unit * 9 + index]:
+                self.HomelessLabelsCount -= 1
+        self.SudokuPuzzle[cell] = label
+
+        if current_label == '' or label == '':
+            # The cell got filled (or emptied)
+            change = 1 if label == '' else -1
+            self.EmptyCellsCount += change
+            if self.CellCandidates[cell] == 0:
+                self.ContradictedCellsCount += change
+            self.CountCells[self.CandidatesCount[cell]] ^= 1 << cell
+
+    def _SetCandidates(self, cell, candidates):
+        """Set the candidates mask of 'cell' (and its bookkeeping)."""
+        count = BitCount[candidates]
+        if self.SudokuPuzzle[cell] == '':
+            if candidates == 0:
+                self.ContradictedCellsCount += 1
+            if self.CellCandidates[cell] == 0:
+                self.ContradictedCellsCount -= 1
+            CountCells = self.CountCells
+            CountCells[self.CandidatesCount[cell]] ^= 1 << cell
+            CountCells[count] ^= 1 << cell
+        changed = self.CellCandidates[cell] ^ candidates
+        self.CellCandidates[cell] = candidates
+        self.CandidatesCount[cell] = count
+
+        UnitLabels = self.UnitLabels
+        UnitPlaces = self.UnitPlaces
+        ConjugateUnits = self.ConjugateUnits
+        while changed:
+            bit = changed & -changed
+            changed ^= bit
+            index = LowestLabelIndex[bit] - 1
+            for unit, place in CellPlaces[cell]:
+                places = UnitPlaces[unit * 9 + index] ^ place
+                UnitPlaces[unit * 9 + index] = places
+                if BitCount[places] == 2:
+                    ConjugateUnits[index] |= 1 << unit
+                else:
+                    ConjugateUnits[index] &= ~(1 << unit)
+                if not UnitLabels[unit] & bit:
+                    if not places:
+                        self.HomelessLabelsCount += 1
+                    elif places == place:
+                        self.HomelessLabelsCount -= 1
+
+    def SavePuzzle(self):
+        """Return a mark of the current state of the puzzle (to be passed to
+        LoadPuzzle or GetChanges later on).
+
+        Nothing is copied, the mark is just the length of the trail.
+        """
+        return len(self.Trail)
+
+    def LoadPuzzle(self, mark):
+        """Undo all the changes made to the puzzle after SavePuzzle returned
+        'mark'. Costs only as much as the number of changes undone."""
+        trail = self.Trail
+        while len(trail) > mark:
+            kind, cell, old, new = trail.pop()
+            if kind == CandidatesChange:
+                self._SetCandidates(cell, old)
+            else:
+                self._ReplaceLabel(cell, new, old)
+
+    def GetChanges(self, mark):
+        """Return the changes made to the puzzle after SavePuzzle returned
+        'mark' (to be redone later on by RedoChanges)."""
+        return self.Trail[mark:]
+
+    def RedoChanges(self, changes):
+        """Redo 'changes' (returned by GetChanges) on the puzzle.
+
+        The puzzle must be in the same state as it was when the first of the
+        changes was made (ie loaded with the mark passed to GetChanges).
+        """
+        for change in changes:
+            kind, cell, old, new = change
+            if kind == CandidatesChange:
+                self._SetCandidates(cell, new)
+            else:
+                self._ReplaceLabel(cell, old, new)
+        self.Trail.extend(changes)
+
+    def SolveSudokuPuzzle(self, str_input_puzzle):
+        """
+        Solve the puzzle in the string str_input_puzzle with
+        MaxAssumptionLevel and return the solution puzzle (as a string).
+
+        MaxAssumptionLevel = 3 can solve almost all sudoku puzzles which have
+        a solution. But, just to be on a safe side, keep the
+        MaxAssumptionLevel = 4 (I have not found any puzzle requiring 4 or
+        more levels of assumption to solve it.)
+        With MaxAssumptionLevel None, no level needs to be chosen (see
+        _SolveAdaptively).
+
+        The attribute Status tells how the solve ended - Solved, Unsolved,
+        or BudgetExceeded or Cancelled if it was stopped midway (see
+        __init__). A solve stopped midway returns the puzzle as it was
+        before the outermost assumption then made, ie filled only as far as
+        it could be for sure.
+        """
+        # Start from an empty puzzle, even if the previous solve on this
+        # instance was left midway (by an exception for example).
+        self.ClearPuzzle()
+        if self.time_limit is not None:
+            self.Deadline = time.time() + self.time_limit
+        consistent = self.ReadPuzzleFromString(str_input_puzzle)
+        self.PrintPuzzle()
+
+        trace = self.trace
+        trace.event(LineEvent)
+        try:
+            if self.MaxAssumptionLevel is None:
+                trace.event(AdaptiveAssumptionsEvent)
+                self._SolveAdaptively()
+            else:
+                trace.event(MaxAssumptionsEvent, self.MaxAssumptionLevel)
+                self.SolveUptoSteps(self.MaxAssumptionLevel + 1)
+        except SolveInterrupted as interruption:
+            if self.AssumptionMarks:
+                self.LoadPuzzle(self.AssumptionMarks[0])
+            del self.AssumptionMarks[:]
+            del self.Assumptions[:]
+            self.Status = interruption.status
+            if interruption.status == Cancelled:
+                trace.event(CancelledEvent)
+            else:
+                trace.event(BudgetExceededEvent)
+            self.PrintPuzzle()
+        else:
+            # (A puzzle whose labels could not all be read is not the one
+            # asked for, so it is not solved even if it got complete.)
+            if consistent and self.isPuzzleComplete():
+                self.Status = Solved
+            else:
+                self.Status = Unsolved
+        trace.event(LineEvent)
+
+        return self.WritePuzzleToString()
+
+    def SolveUptoSteps(self, MaxSteps, tree=[]):
+        """Solve from steps 1 to MaxAssumptionLevel (including both)"""
+        self._RunSteps(self._SolveUptoSteps(MaxSteps, tree))
+
+    def _SolveUptoSteps(self, MaxSteps, tree):
+        """SolveUptoSteps, as a generator (see _RunSteps)."""
+        if self.branching == 'mrv':
+            self.Step1()
+            if MaxSteps != 1:
+                self.Search(tree)
+        elif MaxSteps == 1:
+            self.Step1()
+        else:
+            self.Step1()
+
+            for k in xrange(2, MaxSteps + 1):
+                solved = yield self._Stepk(k, tree)
+                if solved == 1:
+                    break
+
+    def _CheckBudget(self):
+        """Raise SolveInterrupted if the solve is to be stopped, ie if it is
+        cancelled or its time_limit or nodes_limit is reached (see __init__,
+        assignments_limit is checked by _CountAssignment)."""
+        if self.cancel is not None and self.cancel.cancelled:
+            raise SolveInterrupted(Cancelled)
+        if self.nodes_limit is not None and \
+                self.Stats['branches'] >= self.nodes_limit or \
+                self.Deadline is not None and time.time() >= self.Deadline:
+            raise SolveInterrupted(BudgetExceeded)
+
+    def _CountAssignment(self):
+        """Count a cell about to be filled (by Step1 or by an assumption) in
+        the attribute Assignments. Raise SolveInterrupted instead if
+        assignments_limit cells are already filled."""
+        if self.assignments_limit is not None and \
+                self.Assignments >= self.assignments_limit:
+            raise SolveInterrupted(BudgetExceeded)
+        self.Assignments += 1
+
+    def _CheckLevelsBudget(self):
+        """Raise LevelsBudgetSpent if the budget of the assumption levels
+        being raised by _SolveAdaptively is spent."""
+        if not self.RaisingLevels:
+            return
+        if self.Stats['branches'] >= self.adaptive_nodes or \
+                self.LevelsDeadline is not None and \
+                time.time() >= self.LevelsDeadline:
+            raise LevelsBudgetSpent()
+
+    def _SolveAdaptively(self):
+        """SolveUptoSteps with no MaxAssumptionLevel.
+
+        As SolveUptoSteps, Stepk is tried with one assumption level after
+        the other, but for as long as the puzzle is not solved, rather than
+        up to MaxAssumptionLevel. The level raised to is kept in
+        Stats['needed_level'] (0 if Step1 alone solved the puzzle).
+
+        A higher level costs a lot more than the previous one, so the
+        levels are given a budget (see adaptive_nodes and adaptive_time in
+        __init__), checked by Stepk before every assumption. Once it is
+        spent, the level being tried is given up (undoing its assumption in
+        hand) and Search finishes the puzzle instead - as it does if no
+        cell has 2 permissible labels (for Stepk to make assumptions on), or
+        as soon as a level leaves the puzzle as it was. (A puzzle having
+        more than one solution never gets anything from any level, so
+        raising the level would only spend the whole budget, and a higher
+        level mostly costs more than Search anyway.)
+        So the puzzle is always solved, if it has a solution.
+        """
+        stats = self.Stats
+        self.Step1()
+        if self.branching == 'mrv':
+            stats['searched'] = 1
+            self.Search()
+            return
+
+        if self.adaptive_time is not None:
+            self.LevelsDeadline = time.time() + self.adaptive_time
+        self.RaisingLevels = 1
+        level = 0
+        event = SearchingEvent
+        try:
+            while not self.isPuzzleComplete() and self.isPuzzleCorrect():
+                if not self.CountCells[2]:
+                    break
+                self._CheckLevelsBudget()
+                level += 1
+                stats['needed_level'] = level
+                mark = self.SavePuzzle()
+                self._RunSteps(self._Stepk(level + 1, []))
+                if self.SavePuzzle() == mark:
+                    break
+        except LevelsBudgetSpent:
+            if self.AssumptionMarks:
+                self.LoadPuzzle(self.AssumptionMarks[0])
+            del self.AssumptionMarks[:]
+            del self.Assumptions[:]
+            event = SearchingInsteadEvent
+        finally:
+            self.RaisingLevels = 0
+            self.LevelsDeadline = None
+
+        if not self.isPuzzleComplete() and self.isPuzzleCorrect():
+            self.trace.event(event)
+            stats['searched'] = 1
+            self.Search()
+
+    def _RunSteps(self, steps):
+        """Run the generator 'steps' (see _SolveUptoSteps and _Stepk) and
+        return what it returns.
+
+        SolveUptoSteps and Stepk call each other, for every nested
+        assumption and for every step the puzzle moves ahead. Rather than
+        doing so recursively, they are generators, which yield the generator
+        of the call to be made and get back what it returns as the value of
+        the yield. Yielding anything else (1 or 0) returns it (None if the
+        generator just ends).
+
+        The generators are run here, off an explicit stack. So solving
+        never runs into the recursion limit of python, and the stack is
+        only as deep as the assumptions are nested (Search, which nests no
+        deeper than the number of empty cells, still calls itself).
+        """
+        stack = [steps]
+        value = None
+        while stack:
+            try:
+                value = stack[-1].send(value)
+            except StopIteration:
+                value = None
+                stack.pop()
+                continue
+            if isinstance(value, GeneratorType):
+                stack.append(value)
+                value = None
+            else:
+                stack.pop().close()
+        return value
+
+    def Step1(self):
+        """Try to solve the puzzle "exactly" (as far as possible).
+
+        This is very first step in solving the puzzle and hence the name-
+        'Step1'.
+        It uses 2 algorithms to solve the puzzle exactly.
+        -----------------
+        1st algorithm -
+        -----------------
+        Fill all the empty sudokucells which have only 1 permissible label
+        other than '' (empty string) (ie a total of 2 permissible
+        labels) with the non empty permissible label.
+
+        -----------------
+        2nd alogrithm -
+        -----------------
+        If a particular label (in SudokuCell.Labels) is possible in
+        only one sudokucell in a row then that label is can be
+        confidently set to that sudokucell. (Note: row, col and box
+        approaches are all symmetric, so you can apply this rule by replacing
+        row by column (or box) and you will get the same result. But there is
+        no need to apply it for both row and column (and/or box) because it
+        will unnecssarily waste cpu time. Just one check (either row or column
+        or box) is enough (this can be proved.)) This check must be made for
+        every possible label in SudokuCell.Labels (except for '' (empty
+        string)) in every row (or column or box, which ever you used before.)
+        Once you get a sure hit, break from this algorithm immediately
+        and go for the 1st algorithm (as this one is much more time
+        complex.)
+        (The above holds for the puzzle as a whole, but checking cols and
+        boxes too fills the cells in fewer passes and leaves less to the
+        assumptions of Stepk. So, with hidden_singles='all', this check is
+        made for every row, col and box. The cells in which a label is
+        possible are looked up in the attribute UnitPlaces.)
+
+        The variable data_changed will let know if the puzzle has been solved
+        any further in any of the two algorithms. If data_changed is 1 then
+        loop will continue to cycle through algorithms 1 and 2, else it will
+        break.
+
+        """
+        if self.isPuzzleComplete():
+            return
+
+        self.trace.event(SolvingExactlyEvent)
+        data_changed = 1
+        CellCandidates = self.CellCandidates
+        CandidatesCount = self.CandidatesCount
+        UnitPlaces = self.UnitPlaces
+
+        while data_changed != 0:
+            data_changed = 0
+            self._CheckBudget()
+
+            # 1st algorithm -
+            for cell in xrange(81):
+                # (CellCandidates of filled cells is 0, so they are skipped)
+                if CandidatesCount[cell] == 1:
+                    label = Labels[LowestLabelIndex[CellCandidates[cell]]]
+                    self._FillCell(cell, label, 1)
+                    data_changed = 1
+
+            # This might help in improving the time complexity as the
+            # 2nd alogrithm is more time complex.
+            if (data_changed == 1):
+                continue
+
+            # 2nd algorithm -
+            for unit in self.HiddenSinglesUnits:
+                for i in xrange(1, 10):  # start from i=1 to skip 1st label
+                    places = UnitPlaces[unit * 9 + i - 1]
+                    if BitCount[places] != 1:
+                        continue
+                    cell = Units[unit][LowestLabelIndex[places] - 1]
+                    self._FillCell(cell, Labels[i], 2)
+                    data_changed = 1
+
+            # Other techniques (only once both the algorithms have nothing
+            # more to fill) -
+            if data_changed == 0:
+                data_changed = self.ApplyTechniques()
+
+        self.PrintPuzzle()
+
+    def PropagateSingles(self, stop_on_contradiction=False):
+        """Fill the puzzle using the 2 algorithms of Step1 (but none of the
+        other techniques), for CountSolutions and the generator.
+
+        The 1st algorithm needs no queue - the cells having a single
+        permissible label are kept in CountCells[1], and are filled first.
+        For the 2nd one, all the units searched by it are queued to start
+        with, and once a cell is filled, its own units and those in which
+        its label is left with a single place are queued again.
+
+        If stop_on_contradiction is True, filling stops as soon as the puzzle
+        is found incorrect (a cell or a label with no place left), leaving
+        it half filled (for the caller to revert).
+        """
+        CellCandidates = self.CellCandidates
+        CountCells = self.CountCells
+        UnitPlaces = self.UnitPlaces
+        HiddenSinglesUnits = self.HiddenSinglesUnits
+        units_queue = deque(HiddenSinglesUnits)
+        # (units not searched by the 2nd algorithm are never queued)
+        unit_queued = [1] * 27
+
+        while CountCells[1] or units_queue:
+            if stop_on_contradiction and (self.ContradictedCellsCount or
+                                          self.HomelessLabelsCount):
+                return
+            if CountCells[1]:
+                # 1st algorithm -
+                cells = CountCells[1]
+                cell = (cells & -cells).bit_length() - 1
+                i = LowestLabelIndex[CellCandidates[cell]]
+                rule = 1
+            else:
+                # 2nd algorithm -
+                unit = units_queue.popleft()
+                unit_queued[unit] = 0
+                for i in xrange(1, 10):
+                    places = UnitPlaces[unit * 9 + i - 1]
+                    if BitCount[places] == 1:
+                        break
+                else:
+                    continue
+                cell = Units[unit][LowestLabelIndex[places] - 1]
+                rule = 2
+            self._FillCell(cell, Labels[i], rule)
+            for unit in CellUnits[cell]:
+                if not unit_queued[unit]:
+                    unit_queued[unit] = 1
+                    units_queue.append(unit)
+            index = i - 1
+            for unit in HiddenSinglesUnits:
+                if not unit_queued[unit] and \
+                        BitCount[UnitPlaces[unit * 9 + index]] == 1:
+                    unit_queued[unit] = 1
+                    units_queue.append(unit)
+
+    def ApplyTechniques(self):
+        """Apply the techniques asked for (see __init__), in the given order,
+        until one of them removes any candidates. Return 1 if one did, else
+        return 0."""
+        for technique in self.techniques:
+            self._CheckBudget()
+            method, code = self.TechniqueMethods[technique]
+            removed = getattr(self, method)()
+            if removed:
+                self.trace.event(code, removed)
+                return 1
+        return 0
+
+    def _RemoveCandidates(self, cell, labels):
+        """Remove 'labels' (a candidates mask) from the permissible labels of
+        the (empty) 'cell'. Return the number of labels removed."""
+        old_candidates = self.CellCandidates[cell]
+        candidates = old_candidates & ~labels
+        if candidates == old_candidates:
+            return 0
+        self.Trail.append((CandidatesChange, cell, old_candidates, candidates))
+        self._SetCandidates(cell, candidates)
+        return BitCount[old_candidates ^ candidates]
+
+    def EliminateSubsets(self):
+        """Remove candidates using naked and hidden subsets (pairs, triples
+        and quads) in every row, col and box. Return the number of
+        candidates removed.
+
+        Naked subset - n empty cells of a unit, which together have only n
+        permissible labels. These labels have to go in these cells, so they
+        are removed from the other cells of the unit.
+        Hidden subset - n labels not placed in a unit, which together are
+        permissible in only n cells of the unit (see UnitPlaces). These
+        cells have to take these labels, so the other labels are removed
+        from them.
+        """
+        CellCandidates = self.CellCandidates
+        CandidatesCount = self.CandidatesCount
+        UnitLabels = self.UnitLabels
+        UnitPlaces = self.UnitPlaces
+        stats = self.Stats
+        removed = 0
+
+        for unit in xrange(27):
+            cells = Units[unit]
+            for n in xrange(2, 5):
+                # naked subsets -
+                choices = [cell for cell in cells
+                           if 2 <= CandidatesCount[cell] <= n]
+                for subset in combinations(choices, n):
+                    labels = 0
+                    for cell in subset:
+                        labels |= CellCandidates[cell]
+                    if BitCount[labels] != n:
+                        continue
+                    count = 0
+                    for cell in cells:
+                        if cell not in subset:
+                            count += self._RemoveCandidates(cell, labels)
+                    if count:
+                        stats['naked_subsets'] += 1
+                        removed += count
+
+                # hidden subsets -
+                choices = [i for i in xrange(9)
+                           if not UnitLabels[unit] & 1 << i and
+                           2 <= BitCount[UnitPlaces[unit * 9 + i]] <= n]
+                for subset in combinations(choices, n):
+                    labels = 0
+                    places = 0
+                    for i in subset:
+                        labels |= 1 << i
+                        places |= UnitPlaces[unit * 9 + i]
+                    if BitCount[places] != n:
+                        continue
+                    count = 0
+                    while places:
+                        place = places & -places
+                        places ^= place
+                        cell = cells[LowestLabelIndex[place] - 1]
+                        count += self._RemoveCandidates(
+                            cell, AllLabelsMask & ~labels)
+                    if count:
+                        stats['hidden_subsets'] += 1
+                        removed += count
+
+        return removed
+
+    def _RemoveFromPlaces(self, unit, places, label):
+        """Remove 'label' (a candidates mask) from the permissible labels of
+        the cells at 'places' in 'unit'. Return the number of labels
+        removed."""
+        cells = Units[unit]
+        count = 0
+        while places:
+            place = places & -places
+            places ^= place
+            count += self._RemoveCandidates(
+                cells[LowestLabelIndex[place] - 1], label)
+        return count
+
+    def EliminateLockedCandidates(self):
+        """Remove candidates using locked candidates at every intersection
+        of a box with a row or col (see Intersections). Return the number of
+        candidates removed.
+
+        The places of a label at an intersection are those of the label in
+        the box (or the line) masked with the places of the intersection -
+        Pointing - a label permissible in a box only at the intersection
+        has to go there, so it is removed from the rest of the line.
+        Claiming - a label permissible in a line only at the intersection
+        has to go there, so it is removed from the rest of the box.
+        """
+        UnitPlaces = self.UnitPlaces
+        stats = self.Stats
+        removed = 0
+
+        for box, line, boxplaces, lineplaces in Intersections:
+            for i in xrange(9):
+                inbox = UnitPlaces[box * 9 + i]
+                inline = UnitPlaces[line * 9 + i]
+                if not inbox & boxplaces:
+                    # (label placed in the box, or not permissible at the
+                    # intersection)
+                    continue
+                if not inbox & ~boxplaces and inline & ~lineplaces:
+                    removed += self._RemoveFromPlaces(
+                        line, inline & ~lineplaces, 1 << i)
+                    stats['pointing'] += 1
+                elif not inline & ~lineplaces and inbox & ~boxplaces:
+                    removed += self._RemoveFromPlaces(
+                        box, inbox & ~boxplaces, 1 << i)
+                    stats['claiming'] += 1
+
+        return removed
+
+    def EliminateFish(self):
+        """Remove candidates using basic fish (X-Wings, Swordfish and
+        Jellyfish) of every label. Return the number of candidates removed.
+
+        Fish - n rows (the base) in which a label is permissible only in n
+        cols (the cover) altogether. The label has to go in these n cols
+        within the base rows, so it is removed from the rest of the cover
+        cols. The same goes with rows and cols swapped.
+
+        The places of a label in a row (see UnitPlaces) are the cols in
+        which it is permissible, and vice versa, so the cover of a base is
+        just the OR of the places of its lines.
+        """
+        UnitPlaces = self.UnitPlaces
+        stats = self.Stats
+        removed = 0
+
+        for i in xrange(9):
+            label = 1 << i
+            # rows (units 0 to 8) as the base and cols (9 to 17) as the
+            # cover, then the other way round
+            for base, cover in ((0, 9), (9, 0)):
+                for n, name in ((2, 'x_wings'), (3, 'swordfish'),
+                                (4, 'jellyfish')):
+                    choices = [line for line in xrange(9)
+                               if 2 <= BitCount[UnitPlaces[(base + line) *
+                                                           9 + i]] <= n]
+                    for subset in combinations(choices, n):
+                        lines = 0
+                        places = 0
+                        for line in subset:
+                            lines |= 1 << line
+                            places |= UnitPlaces[(base + line) * 9 + i]
+                        if BitCount[places] != n:
+                            continue
+                        count = 0
+                        while places:
+                            place = places & -places
+                            places ^= place
+                            unit = cover + LowestLabelIndex[place] - 1
+                            count += self._RemoveFromPlaces(
+                                unit, UnitPlaces[unit * 9 + i] & ~lines,
+                                label)
+                        if count:
+                            stats[name] += 1
+                            removed += count
+
+        return removed
+
+    def _GetStrongLinks(self, node):
+        """Return the candidates strongly linked to the candidate 'node'
+        (see EliminateChains), ie those which have to be true if 'node' is
+        false."""
+        cell = node / 9
+        index = node % 9
+        links = []
+        if self.CandidatesCount[cell] == 2:
+            other = self.CellCandidates[cell] & ~(1 << index)
+            links.append(cell * 9 + LowestLabelIndex[other] - 1)
+        conjugate = self.ConjugateUnits[index]
+        if conjugate:
+            UnitPlaces = self.UnitPlaces
+            for unit, place in CellPlaces[cell]:
+                if conjugate >> unit & 1:
+                    other = UnitPlaces[unit * 9 + index] & ~place
+                    links.append(Units[unit][LowestLabelIndex[other] - 1] *
+                                 9 + index)
+        return links
+
+    def _GetWeakLinks(self, node):
+        """Return the candidates weakly linked to the candidate 'node' (see
+        EliminateChains), ie those which have to be false if 'node' is
+        true."""
+        CellCandidates = self.CellCandidates
+        cell = node / 9
+        index = node % 9
+        bit = 1 << index
+        others = CellCandidates[cell] & ~bit
+        links = []
+        while others:
+            other = others & -others
+            others ^= other
+            links.append(cell * 9 + LowestLabelIndex[other] - 1)
+        for peer in Peers[cell]:
+            if CellCandidates[peer] & bit:
+                links.append(peer * 9 + index)
+        return links
+
+    def _FollowChains(self, start):
+        """Return the candidates which have to be true, and those which
+        have to be false, if the candidate 'start' is false - following the
+        chains of alternating strong and weak links (of up to
+        MaxChainLength strong links) from it, breadth first."""
+        true = set()
+        false = set([start])
+        frontier = [start]
+        for _ in xrange(MaxChainLength):
+            found = []
+            for node in frontier:
+                for link in self._GetStrongLinks(node):
+                    if link not in true:
+                        true.add(link)
+                        found.append(link)
+            frontier = []
+            for node in found:
+                for link in self._GetWeakLinks(node):
+                    if link not in false:
+                        false.add(link)
+                        frontier.append(link)
+            if not frontier:
+                break
+        return true, false
+
+    def EliminateChains(self):
+        """Remove candidates using alternating inference chains (AIC).
+        Return the number of candidates removed.
+
+        A candidate (a label permissible in an empty cell) is numbered
+        cell * 9 + index of the label in Labels - 1, and is linked to other
+        candidates -
+        Strong link - one of the two has to be true. These are the 2
+        candidates of a cell having exactly 2 permissible labels, and the 2
+        candidates of a label permissible in exactly 2 cells of a unit (see
+        ConjugateUnits).
+        Weak link - the two cannot both be true. These are the candidates
+        of the same cell, and those of the same label in peer cells.
+        The strong links are kept up to date along with the candidates
+        masks (and undone with them), so only the search is done here.
+
+        A chain starts at a candidate A taken to be false, and follows
+        strong and weak links alternately (see _FollowChains). Every
+        candidate B reached through a strong link has to be true if A is
+        false, ie A or B is true. Hence -
+            1. if A has to be true (reached) or false as well, A is true -
+               the other labels are removed from its cell.
+            2. if A and B are in the same cell, the other labels are
+               removed from it.
+            3. if A and B are of the same label, it is removed from the
+               cells which are peers of both.
+            4. if A and B are of different labels in peer cells, the label
+               of B is removed from the cell of A and vice versa.
+        Only the eliminations of the 1st chain start which has any are
+        made.
+        """
+        CellCandidates = self.CellCandidates
+        for cell in xrange(81):
+            candidates = CellCandidates[cell]
+            while candidates:
+                bit = candidates & -candidates
+                candidates ^= bit
+                start = cell * 9 + LowestLabelIndex[bit] - 1
+                true, false = self._FollowChains(start)
+                removals = {}
+                if true & false:
+                    removals[cell] = AllLabelsMask & ~bit
+                else:
+                    for node in true:
+                        self._AddChainRemovals(removals, start, node)
+                count = 0
+                for cell_ in sorted(removals):
+                    count += self._RemoveCandidates(cell_, removals[cell_])
+                if count:
+                    self.Stats['chains'] += 1
+                    return count
+        return 0
+
+    def _AddChainRemovals(self, removals, start, end):
+        """Add the candidates removed because either of the candidates
+        'start' and 'end' is true (see EliminateChains) to 'removals' (a
+        dict of candidates masks, by cell)."""
+        CellCandidates = self.CellCandidates
+        cell, index = divmod(start, 9)
+        cell_, index_ = divmod(end, 9)
+        bit = 1 << index
+        bit_ = 1 << index_
+        if cell == cell_:
+            labels = CellCandidates[cell] & ~(bit | bit_)
+            if labels:
+                removals[cell] = removals.get(cell, 0) | labels
+        elif index == index_:
+            peers = PeerMasks[cell] & PeerMasks[cell_]
+            while peers:
+                peer = peers & -peers
+                peers ^= peer
+                peer = peer.bit_length() - 1
+                if CellCandidates[peer] & bit:
+                    removals[peer] = removals.get(peer, 0) | bit
+        elif PeerMasks[cell] >> cell_ & 1:
+            if CellCandidates[cell] & bit_:
+                removals[cell] = removals.get(cell, 0) | bit_
+            if CellCandidates[cell_] & bit:
+                removals[cell_] = removals.get(cell_, 0) | bit
+
+    def EliminateByUniqueness(self):
+        """Remove candidates using unique rectangles (types 1 to 4) and
+        BUG+1, which hold only for a puzzle having a unique solution. Return
+        the number of candidates removed (always 0 unless assume_unique is
+        set, see __init__).
+
+        Deadly pattern - the 4 empty cells of a rectangle (see Rectangles)
+        all taking 2 labels a and b. These could be swapped with each other
+        to give another solution, so a unique puzzle never ends up with one.
+        Unique rectangle - a rectangle whose cells all have a and b
+        permissible, some of them (the floor) having only these 2. Unless
+        the others (the roof) take some other label, the deadly pattern
+        would be left -
+            Type 1 - a roof of 1 cell, which cannot take a or b.
+            Type 2 - a roof of 2 cells in a row (or col), having the same
+                     one other label, which hence has to go in one of them.
+                     It is removed from the cells which are peers of both.
+            Type 3 - a roof of 2 cells in a unit, whose other labels make a
+                     naked subset (see EliminateSubsets) along with other
+                     cells of the unit. These labels are removed from the
+                     rest of the unit.
+            Type 4 - a roof of 2 cells in a unit, in which a (or b) is
+                     permissible only in these 2 cells. One of them takes a,
+                     so the other cannot take b.
+        BUG+1 - all the empty cells having 2 permissible labels but one,
+        having 3. Unless this cell takes the label which is permissible in 3
+        cells of its row (as well as its col and box), every label would be
+        left with 2 places in every unit, which is a deadly pattern too.
+
+        The floor of any of these unique rectangles has 2 cells in a row (or
+        col), so only the rectangles having 2 such cells with the same 2
+        permissible labels (see LineRectangles) are looked at, rather than
+        all of them.
+        """
+        if not self.assume_unique:
+            return 0
+        CellCandidates = self.CellCandidates
+        stats = self.Stats
+        removed = 0
+
+        # the cells having exactly 2 permissible labels, by these labels
+        floors = {}
+        cells = self.CountCells[2]
+        while cells:
+            cell = cells & -cells
+            cells ^= cell
+            cell = cell.bit_length() - 1
+            floors.setdefault(CellCandidates[cell], []).append(cell)
+
+        for pair in sorted(floors):
+            a = LowestLabelIndex[pair] - 1
+            b = LowestLabelIndex[pair & (pair - 1)] - 1
+            seen = set()
+            for cell1, cell2 in combinations(floors[pair], 2):
+                for rectangle in LineRectangles.get((cell1, cell2), ()):
+                    if rectangle in seen:
+                        continue
+                    seen.add(rectangle)
+                    roof = []
+                    for cell in rectangle:
+                        candidates = CellCandidates[cell]
+                        if candidates & pair != pair:
+                            break
+                        if candidates != pair:
+                            roof.append(cell)
+                    else:
+                        count = 0
+                        if len(roof) == 1:
+                            count = self._RemoveCandidates(roof[0], pair)
+                        elif len(roof) == 2 and \
+                                (roof[0] / 9 == roof[1] / 9 or
+                                 roof[0] % 9 == roof[1] % 9):
+                            count = self._EliminateUniqueRoof(roof, a, b)
+                        if count:
+                            stats['unique_rectangles'] += 1
+                            removed += count
+
+        count = self._EliminateBugPlusOne()
+        if count:
+            stats['bug_plus_one'] += 1
+            removed += count
+        return removed
+
+    def _EliminateUniqueRoof(self, roof, a, b):
+        """Remove candidates using the roof (2 cells in a row or col) of a
+        unique rectangle of the labels (indexes) a and b - types 2, 3 and 4
+        (see EliminateByUniqueness). Return the number of candidates
+        removed."""
+        CellCandidates = self.CellCandidates
+        UnitPlaces = self.UnitPlaces
+        cell1, cell2 = roof
+        pair = 1 << a | 1 << b
+        extra1 = CellCandidates[cell1] & ~pair
+        extra2 = CellCandidates[cell2] & ~pair
+        count = 0
+
+        # type 2 -
+        if extra1 == extra2 and BitCount[extra1] == 1:
+            peers = PeerMasks[cell1] & PeerMasks[cell2]
+            while peers:
+                peer = peers & -peers
+                peers ^= peer
+                count += self._RemoveCandidates(peer.bit_length() - 1,
+                                                extra1)
+
+        places1 = dict(CellPlaces[cell1])
+        places2 = dict(CellPlaces[cell2])
+        for unit in set(places1) & set(places2):
+            cells = Units[unit]
+            roofplaces = places1[unit] | places2[unit]
+            # type 4 -
+            for index, other in ((a, b), (b, a)):
+                if UnitPlaces[unit * 9 + index] == roofplaces:
+                    count += self._RemoveCandidates(cell1, 1 << other)
+                    count += self._RemoveCandidates(cell2, 1 << other)
+            # type 3 - the roof taken as a single cell having the labels
+            # extra1 | extra2, in a naked subset of n cells
+            extra = extra1 | extra2
+            choices = [cell for cell in cells
+                       if cell not in roof and
+                       2 <= self.CandidatesCount[cell] <= 4]
+            for n in xrange(max(BitCount[extra], 2), 5):
+                for subset in combinations(choices, n - 1):
+                    labels = extra
+                    for cell in subset:
+                        labels |= CellCandidates[cell]
+                    if BitCount[labels] != n:
+                        continue
+                    for cell in cells:
+                        if cell not in roof and cell not in subset:
+                            count += self._RemoveCandidates(cell, labels)
+        return count
+
+    def _EliminateBugPlusOne(self):
+        """Remove candidates using BUG+1 (see EliminateByUniqueness).
+        Return the number of candidates removed."""
+        CountCells = self.CountCells
+        cells = CountCells[3]
+        if not cells or cells & (cells - 1):
+            return 0
+        for count in (0, 1, 4, 5, 6, 7, 8, 9):
+            if CountCells[count]:
                 return 0
-    return 1
+        cell = cells.bit_length() - 1
+        UnitLabels = self.UnitLabels
+        UnitPlaces = self.UnitPlaces
+        label = 0
+        for unit in xrange(27):
+            for index in xrange(9):
+                if UnitLabels[unit] & 1 << index:
+                    continue
+                count = BitCount[UnitPlaces[unit * 9 + index]]
+                if count == 3 and unit in CellUnits[cell]:
+                    label |= 1 << index
+                elif count != 2:
+                    return 0
+        if BitCount[label] != 1:
+            return 0
+        return self._RemoveCandidates(cell, AllLabelsMask & ~label)
+
+    def _FillCell(self, cell, label, rule):
+        """Set 'label' to the (empty) 'cell' and tell so in the solution.
+
+        rule --> the algorithm of Step1 which found 'label' (1 or 2).
+
+        The solve is checked (see _CheckBudget and _CountAssignment) before
+        every cell filled, so that it stops right when asked to.
+        """
+        self._CheckBudget()
+        self._CountAssignment()
+        self.setSudokuCellLabel(cell / 9, cell % 9, label)
+        self.trace.event(FillEvent, cell / 9 + 1, cell % 9 + 1, label, rule)
+        if rule == 1:
+            self.Stats['naked_singles'] += 1
+        else:
+            self.Stats['hidden_singles'] += 1
+
+    def _CountAssumption(self, assumptionleveltree):
+        """Count an assumption made at 'assumptionleveltree' in Stats (and
+        the cell it fills, see _CountAssignment)."""
+        self._CountAssignment()
+        stats = self.Stats
+        stats['branches'] += 1
+        stats['max_depth'] = max(stats['max_depth'], len(assumptionleveltree))
+
+    def _LookupTransposition(self, MaxSteps):
+        """Return the result recorded in the transposition table for the
+        puzzle as it is now (see Stepk), if it holds for SolveUptoSteps with
+        MaxSteps too, else None.
+
+        A contradiction holds for any MaxSteps, whereas nothing being found
+        holds only for MaxSteps no more than those it was found with.
+        """
+        if self.Transpositions is None:
+            return None
+        entry = self.Transpositions.get(self.Hash)
+        if entry is None:
+            return None
+        result, MaxSteps_ = entry
+        if result == Contradiction or \
+                result == Undecided and MaxSteps <= MaxSteps_:
+            self.Stats['transpositions'] += 1
+            return result
+        return None
+
+    def _RecordTransposition(self, position, result, MaxSteps):
+        """Record the result of an assumption in the transposition table,
+        'position' being the Hash of the puzzle right after the assumption
+        was made. The table is emptied once it has 'transpositions' puzzles,
+        to keep it to that size."""
+        table = self.Transpositions
+        if table is None:
+            return
+        if len(table) >= self.transpositions:
+            table.clear()
+        table[position] = (result, MaxSteps)
+
+    def _RecordNogood(self, cell, label):
+        """Record that 'label' is definately incorrect in 'cell' as long as
+        the assumptions being made (see Assumptions) hold.
+
+        A label found incorrect under no assumption at all is not recorded,
+        as the other label of its cell is then set for good (see Stepk). Nor
+        is one found under more than MaxNogoodSize assumptions, as these
+        seldom come together again.
+        """
+        assumptions = tuple(self.Assumptions)
+        if not self.nogoods or not assumptions or \
+                len(assumptions) > MaxNogoodSize:
+            return
+        nogood = (assumptions, cell, label)
+        for assumption in assumptions:
+            self.Nogoods.setdefault(assumption, []).append(nogood)
+
+    def _ApplyNogoods(self, cell, label):
+        """Remove the labels recorded as definately incorrect (see
+        _RecordNogood) under assumptions which all hold now that 'label' is
+        assumed in 'cell'. Return the number of candidates removed.
+
+        Holding means having the assumed labels in the puzzle, whether they
+        are assumed again or have been found otherwise.
+        """
+        SudokuPuzzle = self.SudokuPuzzle
+        count = 0
+        for assumptions, cell_, label_ in self.Nogoods.get((cell, label), ()):
+            for cell__, label__ in assumptions:
+                if SudokuPuzzle[cell__] != label__:
+                    break
+            else:
+                count += self._RemoveCandidates(cell_, LabelBits[label_])
+        if count:
+            self.Stats['nogoods'] += count
+            self.trace.event(NogoodsEvent, count)
+        return count
+
+    def GetFewestCandidatesCell(self):
+        """Return the empty cell with the fewest permissible labels (the 1st
+        one of them, row after row), None if the puzzle is complete.
+
+        Costs a look at no more than the 10 masks of CountCells, not at
+        every cell.
+        """
+        for cells in self.CountCells:
+            if cells:
+                return (cells & -cells).bit_length() - 1
+        return None
+
+    def Search(self, basetree=[]):
+        """Try to solve the puzzle using assumptions, on the cell with the
+        fewest permissible labels (MRV - minimum remaining values).
+
+        Every permissible label of the cell is assumed in turn and the puzzle
+        is solved further by Step1 and (recursively) by this method. The
+        first assumption leading to a complete puzzle is kept, the others are
+        undone. Unlike Stepk, the cell may have any number of permissible
+        labels and the assumptions may be nested as deep as needed, so a
+        puzzle having a solution always gets solved.
+
+        basetree --> list of parent assumption levels (see Stepk).
+
+        ==============
+        Return value:
+        ==============
+        1 - puzzle was solved.
+        0 - puzzle has no solution (from the point this method was called).
+
+        """
+        trace = self.trace
+        trace.event(CompleteQuestionEvent)
+        if self.isPuzzleComplete():
+            trace.event(CompleteEvent)
+            return 1
+        trace.event(NotCompleteEvent)
+
+        cell = self.GetFewestCandidatesCell()
+        row = cell / 9
+        col = cell % 9
+        assumptionleveltree = basetree + [len(basetree) + 1]
+        trace.event(AssumptionLevelEvent, assumptionleveltree)
+        self.Stats['assumption_levels'] += 1
+        initialpuzzle = self.SavePuzzle()
+
+        # (An empty cell without permissible labels gets picked before any
+        # other, so a puzzle which is already incorrect is not searched.)
+        for label in self.GetPermissibleLabels(row, col, 9):
+            self._CheckBudget()
+            trace.event(AssumingEvent, label, row + 1, col + 1)
+            self._CountAssumption(assumptionleveltree)
+            self.AssumptionMarks.append(initialpuzzle)
+            self.setSudokuCellLabel(row, col, label)
+            self.Step1()
+
+            trace.event(CorrectQuestionEvent)
+            if self.isPuzzleCorrect():
+                trace.event(GoingDeeperEvent)
+                if self.Search(assumptionleveltree):
+                    self.AssumptionMarks.pop()
+                    return 1
+            trace.event(IncorrectEvent, label, row + 1, col + 1)
+            self.Stats['contradictions'] += 1
+            self.LoadPuzzle(initialpuzzle)
+            self.AssumptionMarks.pop()
+
+        trace.event(NoLabelFitsEvent, row + 1, col + 1, assumptionleveltree)
+        return 0
 
+    def CountSolutions(self, limit=2):
+        """Return the number of solutions of the puzzle (as it is now),
+        counting no further than 'limit' (so 1 means the solution is unique
+        and 0 that there is none).
+
+        The same as Search, but silently (nothing is written to the trace,
+        nor counted in Stats), filling cells by PropagateSingles and carrying
+        on after a solution is found, until 'limit' of them are. The puzzle
+        is left as it was.
+        """
+        trace = self.trace
+        stats = self.Stats
+        assignments = self.Assignments
+        self.trace = NullTrace()
+        self.Stats = dict(stats)
+        initialpuzzle = self.SavePuzzle()
+        try:
+            return self._CountSolutions(limit)
+        finally:
+            self.LoadPuzzle(initialpuzzle)
+            self.trace = trace
+            self.Stats = stats
+            self.Assignments = assignments
+
+    def _CountSolutions(self, limit):
+        """See CountSolutions."""
+        self.PropagateSingles(stop_on_contradiction=True)
+        # (A label without a place left in a unit is a contradiction too,
+        # whether or not isPuzzleCorrect is asked to look for it.)
+        if self.ContradictedCellsCount or self.HomelessLabelsCount:
+            return 0
+        if self.isPuzzleComplete():
+            return 1
+
+        cell = self.GetFewestCandidatesCell()
+        initialpuzzle = self.SavePuzzle()
+        count = 0
+        for label in self.GetPermissibleLabels(cell / 9, cell % 9, 9):
+            self.setSudokuCellLabel(cell / 9, cell % 9, label)
+            count += self._CountSolutions(limit - count)
+            self.LoadPuzzle(initialpuzzle)
+            if count >= limit:
+                break
+        return count
+
+    # XXX. make sure basetree is passed as expected.
+    def Stepk(self, k, basetree=[]):
+        """Try to solve the puzzle using assumptions.
+
+        k --> The step number. (1st step is solving exactly,
+              2nd step is solving using 1 assumption,
+              3rd step is solving using 2 assumptions and so on.)
+        Note: The assumption level of this step will be k-1.
+
+        basetree --> list of parent assumption levels.
+                     It helps in getting the tree structure of (nested)
+                     assumptions.
+        Example- basetree = [3,2] --> This means that this Stepk function has
+        been called (recursively) from another Stepk function (with k = 3)
+        which was itself called from another Stepk function (with k = 4).
+
+        ==============
+        Return value:
+        ==============
+        1 - puzzle was solved in this step.
+        0 - puzzle was not solved in this step.
+
+        """
+        # Note: If the puzzle being solved does not have a unique solution and
+        # the parameter k is large (say 5 or more) then this function will give
+        # one of the many possible solutions.
+        # But whichever solution it gives, it will be definately correct!
+        return self._RunSteps(self._Stepk(k, basetree))
+
+    def _Stepk(self, k, basetree):
+        """Stepk, as a generator (see _RunSteps).
+
+        Every time the puzzle moves a step ahead, the pass (see _StepkPass)
+        is made all over again, in this loop (rather than by calling Stepk
+        recursively, which used to make the stack as deep as the number of
+        steps made).
+        """
+        while True:
+            solved = yield self._StepkPass(k, basetree)
+            if solved != RestartStepk:
+                yield solved
+
+    def _StepkPass(self, k, basetree):
+        """A pass of Stepk, as a generator (see _RunSteps). Return 1 or 0
+        (as Stepk does), or RestartStepk once the puzzle moves a step
+        ahead."""
+        trace = self.trace
+        trace.event(CompleteQuestionEvent)
+        if self.isPuzzleComplete():
+            trace.event(CompleteEvent)
+            yield 1
+        else:
+            trace.event(NotCompleteEvent)
+            assumptionleveltree = basetree + [k - 1]
+            trace.event(AssumptionLevelEvent, assumptionleveltree)
+            self.Stats['assumption_levels'] += 1
+            initialpuzzle = self.SavePuzzle()
 
-def IsCellEmpty(row, col):
-    """Return 1 if label is '' (empty string) else return 0."""
-    return SudokuPuzzle[row][col] == ''
+            for row in xrange(9):
+                for col in xrange(9):
 
+                    # substitute for sudokucellswithonly2possibilities
+                    if self.CandidatesCount[row * 9 + col] != 2:
+                        continue
 
-def IsLabelPermissible(row, col, label):
-    """Return 1 if value of the key 'label' in the dict
-    LabelsRestrictionsCount is 0 else return 0.
+                    _labels = self.GetPermissibleLabels(row, col, 2)
+                    for i in (0, 1): # iterate through the permissible labels.
+                        self._CheckBudget()
+                        self._CheckLevelsBudget()
 
-    Note: If 'label' is not in global constant 'Labels' then this
-    won't produce any error, as GetLabelIndex would simply return
-    -1. However, GetLabelIndex will give an error for this.
+                        # XXX. improve this
+                        if i == 0:
+                            otherlabel = _labels[1]
+                        else:
+                            otherlabel = _labels[0]
+
+                        trace.event(AssumingOneOfTwoEvent,
+                                    _labels[i], row + 1, col + 1, otherlabel)
+                        self._CountAssumption(assumptionleveltree)
+                        self.setSudokuCellLabel(row, col, _labels[i])
+
+                        # The same puzzle may have been reached before (by
+                        # assuming the same labels in another order, or by
+                        # a previous Stepk with a smaller k). If so, its
+                        # result is taken from the transposition table
+                        # rather than solving the puzzle all over again.
+                        position = self.Hash
+                        result = self._LookupTransposition(k - 1)
+                        if result is not None:
+                            trace.event(TranspositionEvent)
+                        else:
+                            assumption = (row * 9 + col, _labels[i])
+                            if self.nogoods:
+                                self._ApplyNogoods(*assumption)
+                            self.Assumptions.append(assumption)
+                            self.AssumptionMarks.append(initialpuzzle)
+                            if k != 2:
+                                trace.event(EnteringNestedEvent)
+                            yield self._SolveUptoSteps(k - 1,
+                                                       assumptionleveltree)
+                            if k != 2:
+                                trace.event(ExitingNestedEvent)
+                            self.Assumptions.pop()
+                            self.AssumptionMarks.pop()
+
+                        trace.event(CompleteQuestionEvent)
+                        if self.isPuzzleComplete():
+                            # This means that the assumption taken above was
+                            # correct and the puzzle got solved. Hence, return
+                            # 1.
+                            # add this later.. (Assumption Level Tree: %s)
+                            trace.event(CompleteEvent)
+                            self._RecordTransposition(position, Solution,
+                                                      k - 1)
+                            yield 1
+                            return
+                        else:
+                            trace.event(NotCompleteCorrectQuestionEvent)
+                            if result != Contradiction and \
+                                    self.isPuzzleCorrect():
+                                # This means that the puzzle is incompletely
+                                # filled and it cannot be decided from this
+                                # point whether the assumption taken above is
+                                # correct or incorrect.
+                                trace.event(MaybeCorrectEvent,
+                                            _labels[i], row + 1, col + 1)
+                                if result is None:
+                                    self._RecordTransposition(
+                                        position, Undecided, k - 1)
+
+                                # caching
+                                if i == 0:
+                                    # This is caching, for speeding up the
+                                    # solve process. If 'label' is the 1st of
+                                    # the 2 permissible labels then save the
+                                    # solution, it might be possible that the
+                                    # 2nd of the 2 permissible options is
+                                    # definitely incorrect, (and consequently
+                                    # this assumption is correct) so we will
+                                    # need this solution! (better to save it,
+                                    # rather than finding it again later.)
+                                    trace.event(SavingEvent)
+                                    temppuzzle = \
+                                        self.GetChanges(initialpuzzle)
+
+                                # As it cannot be decided standing at this
+                                # point whether the above assumption is correct
+                                # or incorrect, revert to initial conditions
+                                # and try the other options!
+                                trace.event(RevertingEvent)
+                                self.LoadPuzzle(initialpuzzle)
+                                self.PrintPuzzle()
+                            else:
+                                # This means that puzzle is incorrectly filled,
+                                # so it is sure that the above asumption is
+                                # definately incorrect, so the other among the
+                                # 2 permissible labels is definately correct.
+                                trace.event(IncorrectEvent,
+                                            _labels[i], row + 1, col + 1)
+                                self.Stats['contradictions'] += 1
+                                if result is None:
+                                    self._RecordTransposition(
+                                        position, Contradiction, k - 1)
+                                self._RecordNogood(row * 9 + col, _labels[i])
+
+                                # decide whether label is the 1st of the
+                                # permissible the 1st labels or the 2nd one.
+                                if i == 1:
+                                    # This means that the assumption we took
+                                    # (2nd of the 2 permissible labels) is
+                                    # incorrect, & as this assumption is
+                                    # incorrect, the 1st of the 2 assumptions
+                                    # is definately correct. Moreover, the
+                                    # puzzle solution to the 1st permissible
+                                    # label is already saved in temppuzzle, so
+                                    # just load it.
+                                    trace.event(PreviousCorrectEvent,
+                                                otherlabel, row + 1, col + 1)
+                                    self.PrintPuzzle()
+                                    self.LoadPuzzle(initialpuzzle)
+                                    self.RedoChanges(temppuzzle)
+                                else:
+                                    trace.event(OtherCorrectEvent,
+                                                otherlabel, row + 1, col + 1)
+                                    # This means that 2nd of the 2 permissible
+                                    # labels is correct, so revert to the
+                                    # puzzle that was at the beginning of the
+                                    # outermost for loop and then set the 2nd
+                                    # of the 2 permissible labels.
+                                    self.LoadPuzzle(initialpuzzle)
+                                    self._CountAssignment()
+                                    self.setSudokuCellLabel(row, col,
+                                                            _labels[1])
+
+                                # Now, the puzzle solution has moved one step
+                                # ahead, so try to solve it further using the
+                                # "less complex", "previous" steps.
+                                if k != 2:
+                                    trace.event(EnteringNestedEvent)
+                                yield self._SolveUptoSteps(
+                                    k - 1, assumptionleveltree)
+                                if k != 2:
+                                    trace.event(ExitingNestedEvent)
+
+                                # Finally, repeat this step again to solve the
+                                # puzzle further. (it is quite possile that in
+                                # the previous step itself, the puzzle might
+                                # have got solved. If so, the next pass will
+                                # just return from the very 1st check)
+                                yield RestartStepk
+                                return
+
+            # If this part is getting executed means this function did not
+            # help in solving the puzzle any further.
+            trace.event(NothingFromLevelEvent, assumptionleveltree)
+            yield 0
 
-    """
-    return LabelRestrictionsCount[row][col][GetLabelIndex(label)] == 0
 
+#------------------------------------------------------------------------------
+# Module level functions, kept for the callers of the previous versions.
 
-def lenLabelsPermissible(row, col):
-    """Return the number of permissible labels for the cell in (row,col)
+DefaultSolver = Solver()
 
-    Note: '' (empty string) will always be a permissible label for any cell
-    so minimum value returned by this function will be 1.
 
+def SolveSudokuPuzzle(str_input_puzzle, MaxAssumptionLevel=4,
+                      engine='logic', trace=None):
+    """
+    Solve the puzzle in the string str_input_puzzle with MaxAssumptionLevel
+    (None for as many levels as needed, see Solver.SolveSudokuPuzzle) and
+    return the solution puzzle (as a string).
+
+    engine --> what solves the puzzle -
+        'logic' - a Solver, printing the solution on the way (see
+                  Solver.SolveSudokuPuzzle).
+        'dlx' - the exact cover solver of the module dlx, much faster but
+                printing nothing (MaxAssumptionLevel is of no use to it).
+    trace --> where the solution is written to (see Solver.__init__).
+
+    A new solver is used for every call, so this function can be called from
+    any number of threads at once.
     """
-    count = 0
-    for i in xrange(10):    # 10 is the length of the constant 'Labels'
-        if LabelRestrictionsCount[row][col][i] == 0:
-            count += 1
-    return count
+    if engine == 'dlx':
+        # (imported here, so that this module does not depend on any other
+        # unless asked to)
+        import dlx
+        return dlx.SolveSudokuPuzzle(str_input_puzzle)
+    return Solver(MaxAssumptionLevel, trace=trace).SolveSudokuPuzzle(
+        str_input_puzzle)
 
 
-def isPuzzleCorrect():
-    """Return 0 if puzzle is (definately) incorrect else return 1.
+def CountSolutions(str_input_puzzle, limit=2):
+    """
+    Return the number of solutions of the puzzle in the string
+    str_input_puzzle, counting no further than 'limit'. See
+    Solver.CountSolutions.
+
+    Checking that a puzzle has a unique solution is just
+    CountSolutions(str_input_puzzle) == 1. A new Solver is used for every
+    call (as for SolveSudokuPuzzle). A puzzle whose labels cannot all be
+    read (see Solver.ReadPuzzleFromString) has no solution.
+    """
+    solver = Solver(hidden_singles='all', trace=NullTrace())
+    if not solver.ReadPuzzleFromString(str_input_puzzle):
+        return 0
+    return solver.CountSolutions(limit)
 
-    Note: The name of this method is a bit disguised.
-    If it returns 1 it does not necessarily mean that puzzle is
-    correct, only it means that it seems to be correct. It is quite
-    possible that as it is solved further, you will find that it is an
-    incorrect puzzle.
-    But if it returns 0 then the puzzle is definately incorrect!
+count_solutions = CountSolutions
 
-    So, this method is useful only if it returns 0.
 
+def SolveWithinBudget(str_input_puzzle, trace=None, **options):
     """
-    for row in xrange(9):
-        for col in xrange(9):
-            if IsCellEmpty(row, col) and (lenLabelsPermissible(row, col) == 1):
-                return 0
-    return 1
+    Solve the puzzle in the string str_input_puzzle and return the status of
+    the solve (Solved, Unsolved, BudgetExceeded or Cancelled) along with the
+    solution puzzle (as a string), filled only partly unless Solved. See
+    Solver.SolveSudokuPuzzle.
+
+    trace --> where the solution is written to (see Solver.__init__).
+              Nothing is written if None.
+    options --> options of the Solver solving the puzzle (see
+                Solver.__init__), its limits (time_limit, assignments_limit
+                and nodes_limit) and cancel for example.
+    """
+    if trace is None:
+        trace = NullTrace()
+    solver = Solver(trace=trace, **options)
+    solution = solver.SolveSudokuPuzzle(str_input_puzzle)
+    return solver.Status, solution
 
 
-def GetPermissibleLabels(row, col, n):
+def GradePuzzle(str_input_puzzle, trace=None, **options):
     """
-    Return at the most n permissible labels. Will NOT return '' (empty str)
-    as it will always be permissible for any cell.
+    Solve the puzzle in the string str_input_puzzle and return what it took
+    (see Solver.Stats), along with 'solved' (1 if the puzzle got solved
+    else 0).
+
+    The result depends only on the puzzle and the options, so it can be
+    used to sort puzzles by difficulty (unlike the time taken to solve
+    them). For that, the assumption levels raised with MaxAssumptionLevel
+    None are given no time budget (adaptive_time None) unless asked to,
+    as how far they get in a given time depends on the machine, and so
+    would the result.
+
+    trace --> where the solution is written to (see Solver.__init__).
+              Nothing is written if None, which is the fastest.
+    options --> options of the Solver solving the puzzle (see
+                Solver.__init__), MaxAssumptionLevel for example.
     """
-    count = 0
-    labels = []
-    for i in xrange(1, 10):     # Start i from 1 so as to skip ''
-        if count >= n:
-            break
-        if IsLabelPermissible(row, col, Labels[i]):
-            labels += Labels[i]
-            count += 1
-    return labels
+    if trace is None:
+        trace = NullTrace()
+    options.setdefault('adaptive_time', None)
+    solver = Solver(trace=trace, **options)
+    solver.SolveSudokuPuzzle(str_input_puzzle)
+    grade = dict(solver.Stats)
+    grade['solved'] = int(solver.isPuzzleComplete())
+    return grade
 
 
-def setSudokuCellLabel(row, col, label):
-    """See the docstring for sudokupanel.SudokuPanel.setSudokuCellLabel"""
-    global SudokuPuzzle
-    global LabelRestrictionsCount
-
-    current_label = SudokuPuzzle[row][col]
-    if label == current_label:
-        return 1
-
-    if LabelRestrictionsCount[row][col][GetLabelIndex(label)] == 0:
-        # for cells in same row (except for itself) -
-        for row_ in xrange(9):
-            if row_ != row:
-                if current_label != '':
-                    LabelRestrictionsCount[row_][col] \
-                        [GetLabelIndex(current_label)] -= 1
-
-                if label != '':
-                    LabelRestrictionsCount[row_][col] \
-                        [GetLabelIndex(label)] += 1
-
-        # for cells in same col (except for itself) -
-        for col_ in xrange(9):
-            if col_ != col:
-                if current_label != '':
-                    LabelRestrictionsCount[row][col_] \
-                        [GetLabelIndex(current_label)] -= 1
-
-                if label != '':
-                    LabelRestrictionsCount[row][col_] \
-                        [GetLabelIndex(label)] += 1
-
-        # for cells in same box (except for itself) -
-        for row_ in (row / 3 * 3, row / 3 * 3 + 1, row / 3 * 3 + 2):
-            for col_ in (col / 3 * 3, col / 3 * 3 + 1, col / 3 * 3 + 2):
-                if not ((row_ == row) and (col_ == col)):
-                    if current_label != '':
-                        LabelRestrictionsCount[row_][col_] \
-                            [GetLabelIndex(current_label)] -= 1
-
-                    if label != '':
-                        LabelRestrictionsCount[row_][col_] \
-                            [GetLabelIndex(label)] += 1
-
-        SudokuPuzzle[row][col] = label
-        return 1
-    else:
-        print "[Trouble] Failed setting label-\n %s in cell (%d,%d)\n" \
-              % (label, row + 1, col + 1)
-        return 0
+def ReadPuzzleFromString(str_puzzle):
+    """See Solver.ReadPuzzleFromString"""
+    return DefaultSolver.ReadPuzzleFromString(str_puzzle)
 
 
-def SavePuzzle():
-    """Return a deepcopy of SudokuPuzzle and LabelRestrictionsCount"""
-    return deepcopy(SudokuPuzzle), deepcopy(LabelRestrictionsCount)
+def WritePuzzleToString():
+    """See Solver.WritePuzzleToString"""
+    return DefaultSolver.WritePuzzleToString()
 
 
-def LoadPuzzle(_sudokupuzzle, _labelrestrictionscount): # XXX. improve names
-    global SudokuPuzzle
-    global LabelRestrictionsCount
+def PrintPuzzle():
+    """See Solver.PrintPuzzle"""
+    DefaultSolver.PrintPuzzle()
 
-    SudokuPuzzle = deepcopy(_sudokupuzzle)
-    LabelRestrictionsCount = deepcopy(_labelrestrictionscount)
 
-#------------------------------------------------------------------------------
+def isPuzzleComplete():
+    """See Solver.isPuzzleComplete"""
+    return DefaultSolver.isPuzzleComplete()
 
 
-def printlong(character):
-    print character * 25
+def IsCellEmpty(row, col):
+    """See Solver.IsCellEmpty"""
+    return DefaultSolver.IsCellEmpty(row, col)
 
 
-def SolveSudokuPuzzle(str_input_puzzle, MaxAssumptionLevel=4):
-    """
-    Solve the puzzle in the string str_input_puzzle with MaxAssumptionLevel
-    and return the solution puzzle (as a string).
+def IsLabelPermissible(row, col, label):
+    """See Solver.IsLabelPermissible"""
+    return DefaultSolver.IsLabelPermissible(row, col, label)
 
-    MaxAssumptionLevel = 3 can solve almost all sudoku puzzles which have a
-    solution. But, just to be on a safe side, keep the MaxAssumptionLevel = 4
-    (I have not found any puzzle requiring 4 or more levels of assumption
-    to solve it.)
-    """
-    ReadPuzzleFromString(str_input_puzzle)
-    PrintPuzzle()
 
-    printlong('=')
-    print "[Max Assumptions: %d]\n" % MaxAssumptionLevel
-    SolveUptoSteps(MaxAssumptionLevel + 1)
-    printlong('=')
+def lenLabelsPermissible(row, col):
+    """See Solver.lenLabelsPermissible"""
+    return DefaultSolver.lenLabelsPermissible(row, col)
 
-    str_puzzle_solution = WritePuzzleToString()
 
-    # (XXX. Find a better 'pythonic' way to tackle the below problem)
-    # Restore the global variables while exiting from this module,
-    # else, if you try to solve another puzzle, the values from the previous
-    # puzzle will already be in these variables, and will create problems.
-    global SudokuPuzzle
-    global LabelRestrictionsCount
-    SudokuPuzzle = [[''] * 9 for i in xrange(9)]              # an empty puzzle
-    LabelRestrictionsCount = [[[0] * 10 for i in xrange(9)] for j in xrange(9)]
+def isPuzzleCorrect():
+    """See Solver.isPuzzleCorrect"""
+    return DefaultSolver.isPuzzleCorrect()
 
-    return str_puzzle_solution
 
+def GetPermissibleLabels(row, col, n):
+    """See Solver.GetPermissibleLabels"""
+    return DefaultSolver.GetPermissibleLabels(row, col, n)
 
-def SolveUptoSteps(MaxSteps, tree=[]):
-    """Solve from steps 1 to MaxAssumptionLevel (including both)"""
-    if MaxSteps == 1:
-        Step1()
-    else:
-        Step1()
-
-        for k in xrange(2, MaxSteps + 1):
-            solved = Stepk(k, tree)
-            if solved == 1:
-                break
 
+def setSudokuCellLabel(row, col, label):
+    """See Solver.setSudokuCellLabel"""
+    return DefaultSolver.setSudokuCellLabel(row, col, label)
 
-def Step1():
-    """Try to solve the puzzle "exactly" (as far as possible).
-
-    This is very first step in solving the puzzle and hence the name- 'Step1'.
-    It uses 2 algorithms to solve the puzzle exactly.
-    -----------------
-    1st algorithm -
-    -----------------
-    Fill all the empty sudokucells which have only 1 permissible label
-    other than '' (empty string) (ie a total of 2 permissible
-    labels) with the non empty permissible label.
-
-    -----------------
-    2nd alogrithm -
-    -----------------
-    If a particular label (in SudokuCell.Labels) is possible in
-    only one sudokucell in a row then that label is can be
-    confidently set to that sudokucell. (Note: row, col and box approaches
-    are all symmetric, so you can apply this rule by replacing row by
-    column (or box) and you will get the same result. But there is no need
-    to apply it for both row and column (and/or box) because it will
-    unnecssarily waste cpu time. Just one check (either row or column
-    or box) is enough (this can be proved.)) This check must be made for every
-    possible label in SudokuCell.Labels (except for '' (empty string))
-    in every row (or column or box, which ever you used before.)
-    Once you get a sure hit, break from this algorithm immediately
-    and go for the 1st algorithm (as this one is much more time
-    complex.)
-
-    The variable data_changed will let know if the puzzle has been solved
-    any further in any of the two algorithms. If data_changed is 1 then loop
-    will continue to cycle through algorithms 1 and 2, else it will break.
 
-    """
-    if isPuzzleComplete():
-        return
-
-    print "Solving exactly..."
-    data_changed = 1
-
-    while data_changed != 0:
-        data_changed = 0
-
-        # 1st algorithm -
-        for row in xrange(9):
-            for col in xrange(9):
-                if IsCellEmpty(row, col) and \
-                  lenLabelsPermissible(row, col) == 2:
-                  # == 2 becoz 1st element is ''
-
-                    # This part is to avoid the use of GetPermissibleLabels
-                    # as it makes the solving process slightly slower.
-                    for i in xrange(1, 10):       # skip the first label --> ''
-                        if IsLabelPermissible(row, col, Labels[i]):
-                            setSudokuCellLabel(row, col, Labels[i])
-                            print "(%d,%d) --> %s" \
-                                % (row + 1, col + 1, Labels[i])
-                            data_changed = 1
-                            break
+def SavePuzzle():
+    """See Solver.SavePuzzle"""
+    return DefaultSolver.SavePuzzle()
 
-        # This might help in improving the time complexity as the
-        # 2nd alogrithm is more time complex.
-        if (data_changed == 1):
-            continue
 
-        # 2nd algorithm -
-        for row in xrange(9):
-            for i in xrange(1, 10):  # start from i=1 to skip 1st label --> ''
-                count = 0
-                for col in xrange(9):
-                    if IsCellEmpty(row, col) and \
-                      IsLabelPermissible(row, col, Labels[i]):
-                        count += 1
-                        if count > 1:
-                            break
-                        temp_row = row
-                        temp_col = col
+def LoadPuzzle(mark):
+    """See Solver.LoadPuzzle"""
+    DefaultSolver.LoadPuzzle(mark)
 
-                if count == 1:
-                    setSudokuCellLabel(temp_row, temp_col, Labels[i])
-                    print "(%d,%d) --> %s" \
-                        % (temp_row + 1, temp_col + 1, Labels[i])
-                    data_changed = 1
 
-        # XXX. 2nd algorithm can be made more efficient by removing from
-        # the variable 'labels' those labels which are already filled
-        # everywhere.
+def GetChanges(mark):
+    """See Solver.GetChanges"""
+    return DefaultSolver.GetChanges(mark)
 
-    PrintPuzzle()
 
+def RedoChanges(changes):
+    """See Solver.RedoChanges"""
+    DefaultSolver.RedoChanges(changes)
 
-def Stepk(k, basetree=[]):    # XXX. make sure basetree is passed as expected.
-    """Try to solve the puzzle using assumptions.
 
-    k --> The step number. (1st step is solving exactly,
-          2nd step is solving using 1 assumption,
-          3rd step is solving using 2 assumptions and so on.)
-    Note: The assumption level of this step will be k-1.
+def SolveUptoSteps(MaxSteps, tree=[]):
+    """See Solver.SolveUptoSteps"""
+    DefaultSolver.SolveUptoSteps(MaxSteps, tree)
 
-    basetree --> list of parent assumption levels.
-                 It helps in getting the tree structure of (nested)
-                 assumptions.
-    Example- basetree = [3,2] --> This means that this Stepk function has been
-    called (recursively) from another Stepk function (with k = 3) which was
-    itself called from another Stepk function (with k = 4).
 
-    ==============
-    Return value:
-    ==============
-    1 - puzzle was solved in this step.
-    0 - puzzle was not solved in this step.
+def Step1():
+    """See Solver.Step1"""
+    DefaultSolver.Step1()
 
-    """
-    # Note: If the puzzle being solved does not have a unique solution and
-    # the parameter k is large (say 5 or more) then this function will give
-    # one of the many possible solutions.
-    # But whichever solution it gives, it will be definately correct!
-
-    print "Puzzle complete?"
-    if isPuzzleComplete():
-        print "> Complete!"
-        return 1
-    else:
-        print "> Not yet!"
-        assumptionleveltree = basetree + [k - 1]
-        print "\n(New Assumption Level.\nAssumption Tree: %s\n" \
-              "Saving puzzle...)\n" % assumptionleveltree
-        initialpuzzle, initiallabelrestrictionscount = SavePuzzle()
-
-        for row in xrange(9):
-            for col in xrange(9):
-
-                # substitute for sudokucellswithonly2possibilities
-                if (not (IsCellEmpty(row, col) and
-                  (lenLabelsPermissible(row, col) == 3))):
-                    continue # ==3 becoz 1st is a ''
-
-                _labels = GetPermissibleLabels(row, col, 2)
-                for i in (0, 1): # iterate through the permissible labels.
-
-                    # XXX. improve this
-                    if i == 0:
-                        otherlabel = _labels[1]
-                    else:
-                        otherlabel = _labels[0]
-
-                    print "Assuming %s in cell (%d,%d)\n[Other can be %s]\n" \
-                      % (_labels[i], row + 1, col + 1, otherlabel)
-                    setSudokuCellLabel(row, col, _labels[i])
-
-                    if k != 2:
-                        print "(Entering into nested\nassumption...)\n"
-                    SolveUptoSteps(k - 1, assumptionleveltree)
-                    if k != 2:
-                        print "(Exiting from nested\nassumption...)\n"
-
-                    print "Puzzle complete?"
-                    if isPuzzleComplete():
-                        # This means that the assumption taken above was
-                        # correct and the puzzle got solved. Hence, return 1.
-                        print "> Complete!" \
-                               # add this later.. (Assumption Level Tree: %s)
-                        return 1
-                    else:
-                        print "> Not yet!\n\nAssumption correct?"
-                        if isPuzzleCorrect():
-                            # This means that the puzzle is incompletely filled
-                            # and it cannot be decided from this point whether
-                            # the assumption taken above is correct or
-                            # incorrect.
-                            print "Maybe. Can't say anything\nas of now."\
-                                  " Assumption was\n%s in (%d,%d)\n" \
-                                  % (_labels[i], row + 1, col + 1)
-
-                            # caching
-                            if i == 0:
-                                # This is caching, for speeding up the solve
-                                # process. If 'label' is the 1st of the 2
-                                # permissible labels then save the solution, it
-                                # might be possible that the 2nd of the 2
-                                # permissible options is definitely incorrect,
-                                # (and consequently this assumption is correct)
-                                # so we will need this solution!
-                                # (better to save it, rather than finding it
-                                # again later.)
-                                print "Saving the above puzzle.\n" \
-                                      "Will be useful if other\n" \
-                                      "assumption (on same cell)\n"\
-                                      "is definitely incorrect.\n"
-                                temppuzzle, templabelrestrictionscount = \
-                                    SavePuzzle()
-
-                            # As it cannot be decided standing at this point
-                            # whether the above assumption is correct or
-                            # incorrect, revert to initial conditions and try
-                            # the other options!
-                            print "Reverting to this puzzle\n"\
-                                  "(saved at the beginning \n"\
-                                  "of this assumption) -"
-                            LoadPuzzle(initialpuzzle,
-                                       initiallabelrestrictionscount)
-                            PrintPuzzle()
-                        else:
-                            # This means that puzzle is incorrectly filled, so
-                            # it is sure that the above asumption is definately
-                            # incorrect, so the other among the 2 permissible
-                            # labels is definately correct.
-                            print "Definately incorrect!\n" \
-                                  "[%s in cell (%d,%d)]\n" \
-                                  % (_labels[i], row + 1, col + 1)
-
-                            # decide whether label is the 1st of the permissible
-                            # the 1st labels or the 2nd one.
-                            if i == 1:
-                                # This means that the assumption we took
-                                # (2nd of the 2 permissible labels) is
-                                # incorrect, & as this assumption is incorrect,
-                                # the 1st of the 2 assumptions is definately
-                                # correct. Moreover, the puzzle solution to
-                                # the 1st permissible label is already saved in
-                                # temppuzzle, so just load it.
-                                print "Hence previous assumption\n" \
-                                      "was correct - \n" \
-                                      "[%s in cell (%d,%d)]\n" \
-                                      "Revert to the its\n" \
-                                      "solution puzzle. \n" \
-                                      "(Good, I had saved it!\n" \
-                                      "Saved my time!)" \
-                                      % (otherlabel, row + 1, col + 1)
-                                PrintPuzzle()
-                                LoadPuzzle(temppuzzle,
-                                           templabelrestrictionscount)
-                            else:
-                                print "Hence, defintely correct-\n" \
-                                      "[%s in cell (%d,%d)]\n" \
-                                      % (otherlabel, row + 1, col + 1)
-                                # This means that 2nd of the 2 permissible
-                                # labels is correct, so revert to the puzzle
-                                # that was at the beginning of the outermost
-                                # for loop and then set the 2nd of the
-                                # 2 permissible labels.
-                                LoadPuzzle(initialpuzzle,
-                                           initiallabelrestrictionscount)
-                                setSudokuCellLabel(row, col, _labels[1])
-
-                            # Delete all the variables defined at this point,
-                            # as this function will be going into a recursive
-                            # loop from here on, and this data, unnecessarily,
-                            # will form a stack.
-                            del initialpuzzle
-                            del initiallabelrestrictionscount
-                            del row
-                            del col
-                            del _labels
-                            del i
-                            del otherlabel
-
-                            # Now, the puzzle solution has moved one step
-                            # ahead, so try to solve it further using the
-                            # "less complex", "previous" steps.
-                            if k != 2:
-                                print "(Entering into nested\nassumption...)\n"
-                            SolveUptoSteps(k - 1, assumptionleveltree)
-                            if k != 2:
-                                print "(Exiting from nested\nassumption...)\n"
-
-                            # Finally, repeat this step again to solve the
-                            # puzzle further. (it is quite possile that in the
-                            # previous step itself, the puzzle might have got
-                            # solved. If so, it will just enter this function
-                            # (in recursion) and return from the very
-                            # 1st check)
-                            return(Stepk(k, basetree))
-
-    # If this part is getting executed means this function did not help
-    # in solving the puzzle any further.
-    print "Didn't get anything from\nthis Assumption Level.\n" \
-          "Assumption Tree: %s\n" % assumptionleveltree
-    return 0
+
+def Stepk(k, basetree=[]):
+    """See Solver.Stepk"""
+    return DefaultSolver.Stepk(k, basetree)
+
+
+def GetFewestCandidatesCell():
+    """See Solver.GetFewestCandidatesCell"""
+    return DefaultSolver.GetFewestCandidatesCell()
+
+
+def Search(basetree=[]):
+    """See Solver.Search"""
+    return DefaultSolver.Search(basetree)
@@ -4,12 +4,10 @@
 pySudokuSolver main window of GUI
 """
 
-import sys
-from tempfile import NamedTemporaryFile
 from time import time
 from os.path import dirname, join
 from PyQt4 import QtCore, QtGui
-from logic import SolveSudokuPuzzle
+from logic import SolveSudokuPuzzle, CountSolutions, BufferTrace, NullTrace
 from ui_sudoku_solver import Ui_MainWindow, _fromUtf8
 
 __author__ = u"पुष्पक दगड़े (Pushpak Dagade)"
@@ -200,11 +198,12 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
             self.txtbrwSolutionbox.append('[Nothing to solve]')
             return
 
-        # Redirecting the stdout to a temp. file, to temporarily save
-        # solutions in it.
-        temp_file_solutions = NamedTemporaryFile(mode='w')
-        temp = sys.stdout
-        sys.stdout = temp_file_solutions
+        # Keep the solution in memory, only if user wants it (else don't
+        # even put it together).
+        if self.actionShowSolution.isChecked():
+            trace = BufferTrace()
+        else:
+            trace = NullTrace()
 
         # Record the start time
         t0 = time()
@@ -219,8 +218,11 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
                 str_question_puzzle += ". "
 
         # Get solution puzzle for str_question_puzzle
-        # (This is the time consuming operation)
-        str_solution_puzzle = SolveSudokuPuzzle(str_question_puzzle)
+        # (This is the time consuming operation). No level of assumptions is
+        # set, so the puzzle gets solved whenever it has a solution.
+        str_solution_puzzle = SolveSudokuPuzzle(str_question_puzzle,
+                                                MaxAssumptionLevel=None,
+                                                trace=trace)
 
         # Read str_solution_puzzle and fill the grid accordingly.
         numbers = str_solution_puzzle.split()
@@ -230,15 +232,9 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
             else:
                 self.sudokugrid.setSudokuCellLabel(sudokucell, '')
 
-        # Restore the stdout to its previous value
-        sys.stdout = temp
-
-        # Load the solution from the solution file if user wants.
-        temp_file_solutions.flush()
-        if self.actionShowSolution.isChecked():
-            self.txtbrwSolutionbox.append(
-                open(temp_file_solutions.name).read())
-        temp_file_solutions.close()   # closing deletes the temp. file
+        # Load the solution if user wants.
+        if trace.enabled:
+            self.txtbrwSolutionbox.append(trace.getvalue())
 
         # Record the complete time
         t1 = time()
@@ -258,14 +254,23 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
             msgBox.setStandardButtons(QtGui.QMessageBox.Ok)
             msgBox.exec_()
         elif not self.sudokugrid.isPuzzleComplete():
+            msgBox = QtGui.QMessageBox()
+            msgBox.setIcon(QtGui.QMessageBox.Warning)
+            msgBox.setText(
+                "<b>Incorrect puzzle provided</b>."
+                "\n\n"
+                "The given puzzle has no solution. Please recheck.")
+            msgBox.setStandardButtons(QtGui.QMessageBox.Ok)
+            msgBox.exec_()
+        elif CountSolutions(str_question_puzzle) != 1:
             msgBox = QtGui.QMessageBox()
             msgBox.setIcon(QtGui.QMessageBox.Warning)
             msgBox.setText(
                 "<b>Inadequate entries provided.</b>\n"
                 "\n\n"
-                "The puzzle could not be solved within the level of "
-                "assumptions set. Most probably, the puzzle has insufficient "
-                "number of entries for it to have a unique solution."
+                "The puzzle has more than one solution, only one of them is "
+                "shown. Most probably, the puzzle has insufficient number of "
+                "entries for it to have a unique solution."
                 "\n\n"
                 "Please add more entries.")
             msgBox.setStandardButtons(QtGui.QMessageBox.Ok)